@@ -0,0 +1,80 @@
+"""Small-object PUT throughput, with and without checksum group commit.
+
+Drives the object server app in-process (no sockets, no locator) so the number
+reflects the server's own commit path: write, fsync of the object, and the
+append + fsync of <bucket>.sha256 that GROUP_COMMIT batches.
+
+Put BENCH_DIR on the disk you care about; tmpfs makes every fsync free and
+hides the difference. FSYNC_DELAY_MS adds a sleep to every fsync to model a
+slow disk (a USB stick on a Pi) from a machine with a fast one.
+
+Usage:
+  BENCH_DIR=/path/on/disk [FSYNC_DELAY_MS=10] \\
+      python bench_small_puts.py [count] [concurrency] [size]
+"""
+
+import asyncio
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+import httpx
+
+import simpler_objects.object_server as server
+
+BUCKET = "bench"
+WINDOW = 0.002
+FSYNC_DELAY = float(os.environ.get("FSYNC_DELAY_MS", "0")) / 1000
+
+
+async def _run(count, concurrency, size):
+    body = os.urandom(size)
+    limit = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def put(i):
+            async with limit:
+                resp = await client.put(f"/{BUCKET}/obj-{i}.bin", content=body)
+                resp.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*[put(i) for i in range(count)])
+        return count / (time.perf_counter() - start)
+
+
+def bench(group_commit, count, concurrency, size):
+    """Return PUTs per second into a fresh bucket."""
+    base = os.environ.get("BENCH_DIR")
+    with tempfile.TemporaryDirectory(dir=base) as root:
+        (pathlib.Path(root) / BUCKET).mkdir()
+        server.OBJECT_DIRECTORY = root
+        server.GROUP_COMMIT = group_commit
+        return asyncio.run(_run(count, concurrency, size))
+
+
+def _slow_fsync(real_fsync):
+    def fsync(fd):
+        time.sleep(FSYNC_DELAY)
+        real_fsync(fd)
+    return fsync
+
+
+def main():
+    if FSYNC_DELAY:
+        os.fsync = _slow_fsync(os.fsync)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    size = int(sys.argv[3]) if len(sys.argv) > 3 else 4096
+    print(f"{count} PUTs of {size} bytes, {concurrency} concurrent,"
+          f" +{FSYNC_DELAY * 1000:g} ms per fsync")
+    without = bench(None, count, concurrency, size)
+    print(f"  per-PUT fsync:          {without:8.1f} PUT/s")
+    with_gc = bench(WINDOW, count, concurrency, size)
+    print(f"  group commit ({WINDOW * 1000:g} ms): {with_gc:8.1f} PUT/s")
+
+
+if __name__ == '__main__':
+    main()
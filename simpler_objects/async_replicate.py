@@ -1,94 +1,405 @@
 """Basic simple bucket async replication"""
 
 import argparse
+import asyncio
+import json
 import os
+import time
 import warnings
 import random
+import signal
 import sys
 import httpx
 from simpler_objects.common import filter_write_candidates
 
 TIMEOUT=2048
+# Objects replicated at once, and copies allowed to read from (or write to)
+# any one object server at a time.
+CONCURRENCY = int(os.environ.get('REPLICATION_CONCURRENCY', '16'))
+PER_SOURCE = int(os.environ.get('REPLICATION_PER_SOURCE', '4'))
+PER_DEST = int(os.environ.get('REPLICATION_PER_DEST', '4'))
+# Have the destination pull each object from the source (PUT with
+# Copy-Source) instead of relaying the bytes through this process. Needs
+# object servers that support Copy-Source.
+PULL = bool(os.environ.get('REPLICATION_PULL', ''))
+# Env file re-read on SIGHUP to pick up new REPLICATION_*_PER_SEC limits
+# mid-run (see Throttle); the systemd unit points this at its EnvironmentFile.
+ENV_FILE = os.environ.get('REPLICATION_ENV_FILE') or None
+# With a state directory, runs only look at objects committed since the last
+# one (per object-server change feed), and do a full pass every FULL_EVERY s.
+STATE_DIR = os.environ.get('REPLICATION_STATE_DIR') or None
+FULL_EVERY = float(os.environ.get('REPLICATION_FULL_EVERY', '86400'))
+# Change-feed records per request, and keys per locator _locate request.
+CHANGES_PAGE = 10000
+LOCATE_BATCH = 10000
+# A run places copies from one health snapshot, refetched after this many
+# seconds or this many bytes planned onto servers, whichever comes first.
+SNAPSHOT_TTL = float(os.environ.get('REPLICATION_SNAPSHOT_TTL', '60'))
+SNAPSHOT_BYTES = int(os.environ.get('REPLICATION_SNAPSHOT_BYTES', str(10 * 1024 ** 3)))
 
-def find_space(locator, bucket, object_size, current, desired):
-    """Find servers with space for replication"""
-    res = httpx.get(locator + 'health', timeout=4)
-    res.raise_for_status()
-    health = res.json()['servers']
-    candidates = filter_write_candidates(health, object_size, exclude=current)
-    for server in list(candidates.keys()):
+async def find_space(client, locator, bucket, object_size, current, desired):
+    """Find servers with space for replication, from a one-off PlacementSnapshot"""
+    return await PlacementSnapshot(client, locator, bucket).find_space(
+        object_size, current, desired)
+
+def read_env_file(path):
+    """KEY=VALUE pairs from a systemd-style environment file."""
+    env = {}
+    with open(path, encoding='utf-8') as fp:
+        for line in fp:
+            line = line.strip()
+            if not line or line[0] in '#;':
+                continue
+            key, sep, value = line.partition('=')
+            if sep:
+                env[key.strip()] = value.strip().strip('"\'')
+    return env
+
+class TokenBucket:
+    """rate tokens per second, bursting to one second's worth; a rate of 0 is unlimited.
+
+    take() may overdraw the bucket and then sleeps off the debt, so a chunk
+    larger than the burst still goes through, just later. Concurrent takers
+    queue up behind each other's debt.
+    """
+
+    def __init__(self, rate=0.0):
+        self.rate = rate
+        self.tokens = rate
+        self.stamp = time.monotonic()
+
+    def set_rate(self, rate):
+        self.rate = rate
+        self.tokens = min(self.tokens, rate)
+
+    async def take(self, n):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        self.tokens -= n
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+class Throttle:
+    """Replication byte and request rate limits, overall and per object server.
+
+    Rates come from REPLICATION_BYTES_PER_SEC, REPLICATION_REQUESTS_PER_SEC
+    and their REPLICATION_SERVER_* per-server counterparts (unset or 0: no
+    limit). configure() changes the rates of the existing buckets, which is
+    how a SIGHUP adjusts a run already in progress.
+    """
+
+    def __init__(self, env=os.environ):
+        self.bytes = TokenBucket()
+        self.requests = TokenBucket()
+        self.server_bytes = {}
+        self.server_requests = {}
+        self.configure(env)
+
+    def configure(self, env):
+        self.bytes.set_rate(float(env.get('REPLICATION_BYTES_PER_SEC') or 0))
+        self.requests.set_rate(float(env.get('REPLICATION_REQUESTS_PER_SEC') or 0))
+        self.server_byte_rate = float(env.get('REPLICATION_SERVER_BYTES_PER_SEC') or 0)
+        self.server_request_rate = float(env.get('REPLICATION_SERVER_REQUESTS_PER_SEC') or 0)
+        for bucket in self.server_bytes.values():
+            bucket.set_rate(self.server_byte_rate)
+        for bucket in self.server_requests.values():
+            bucket.set_rate(self.server_request_rate)
+
+    @staticmethod
+    def _for(buckets, rate, server):
+        if server not in buckets:
+            buckets[server] = TokenBucket(rate)
+        return buckets[server]
+
+    async def request(self, server):
+        """Wait until one more request to server is allowed."""
+        await self.requests.take(1)
+        await self._for(self.server_requests, self.server_request_rate, server).take(1)
+
+    def limits_bytes(self):
+        """Whether any byte rate limit is in force."""
+        return bool(self.bytes.rate or self.server_byte_rate)
+
+    async def transfer(self, size, *servers):
+        """Wait until size more bytes may move between servers."""
+        await self.bytes.take(size)
+        for server in servers:
+            await self._for(self.server_bytes, self.server_byte_rate, server).take(size)
+
+THROTTLE = Throttle()
+
+def server_of(url):
+    """Base URL (scheme://host:port/) of the server behind an object or bucket URL."""
+    return str(httpx.URL(url).join('/'))
+
+async def throttle_request(request):
+    """httpx request hook applying THROTTLE's request rates."""
+    await THROTTLE.request(server_of(request.url))
+
+async def throttled(chunks, *servers):
+    """Pass chunks through, paced by THROTTLE's byte rates for servers."""
+    async for chunk in chunks:
+        await THROTTLE.transfer(len(chunk), *servers)
+        yield chunk
+
+# Keys ENV_FILE set when the process started; systemd put them in the
+# environment, so on reload the file, not the environment, decides them.
+_env_file_keys = frozenset()
+# A SIGHUP arrived between runs, while no event loop was there to handle it.
+_reload_pending = False
+
+def remember_env_file():
+    """Note which keys ENV_FILE defines now, at startup (see reload_limits)."""
+    global _env_file_keys
+    if ENV_FILE:
         try:
-            result = httpx.head(server + bucket + "/", timeout=1)
-            result.raise_for_status()
-        except httpx.HTTPError:
-            candidates.pop(server)
-    if not candidates:
-        return []
-    # TODO emit warning?
-    desired = min(desired, len(candidates))
-    return random.choices(list(candidates.keys()), list(candidates.values()), k=desired)
-
-def get_object_size(obj, skip_404=False):
+            _env_file_keys = frozenset(read_env_file(ENV_FILE))
+        except OSError:
+            pass
+
+def _note_reload(*_):
+    global _reload_pending
+    _reload_pending = True
+
+def reload_limits():
+    """SIGHUP handler: re-read the rate limits from ENV_FILE into THROTTLE.
+
+    Keys the file defined at startup come from the file alone, so removing
+    a limit from it lifts the limit; the rest of the environment still
+    fills in keys the file never set.
+    """
+    global _reload_pending
+    _reload_pending = False
+    env = {key: value for key, value in os.environ.items() if key not in _env_file_keys}
+    if ENV_FILE:
+        try:
+            env.update(read_env_file(ENV_FILE))
+        except OSError as e:
+            warnings.warn(f'Cannot re-read {ENV_FILE}: {e}')
+            return
+    THROTTLE.configure(env)
+    print("Reloaded replication rate limits")
+
+async def get_object_size(client, obj, skip_404=False):
     """HEAD an object to determine its size and checksum"""
-    result = httpx.head(obj, timeout=2)
+    result = await client.head(obj, timeout=2)
     if skip_404 and result.status_code == 404:
         return 0, None
     result.raise_for_status()
     return int(result.headers['content-length']), result.headers.get('repr-digest')
 
-def replicate_object(source, dest):
-    """Replicate one object"""
-    # TODO multiple at once
-    size, cksum = get_object_size(source)
+async def replicate_object(client, source, dest):
+    """Replicate one object
+
+    With PULL, only control requests go through here: dest fetches the
+    object from source itself and checks it against the source's digest.
+    Such a copy cannot be paced from here, so while a byte rate limit is
+    set (see Throttle) objects are relayed through the throttled stream
+    instead.
+    """
+    size, cksum = await get_object_size(client, source)
     assert size
     assert cksum
-    assert not any(get_object_size(dest, skip_404=True))
-    with httpx.stream("GET", source, timeout=TIMEOUT) as get:
+    assert not any(await get_object_size(client, dest, skip_404=True))
+    servers = (server_of(source), server_of(dest))
+    if PULL and not THROTTLE.limits_bytes():
+        put = await client.put(dest, headers={'Copy-Source': source,
+                                              'Content-Length': '0',
+                                              'Repr-Digest': cksum},
+                               timeout=TIMEOUT)
+        put.raise_for_status()
+        assert await get_object_size(client, dest) == (size, cksum)
+        return size
+    async with client.stream("GET", source, timeout=TIMEOUT) as get:
         get.raise_for_status()
         assert int(get.headers['content-length']) == size
         assert get.headers['repr-digest'] == cksum
-        put = httpx.put(dest, content=get.iter_bytes(),
-                        headers={'Content-Length': str(size),
-                                 'Content-Digest': cksum},
-                        timeout=TIMEOUT)
+        put = await client.put(dest, content=throttled(get.aiter_bytes(), *servers),
+                               headers={'Content-Length': str(size),
+                                        'Content-Digest': cksum},
+                               timeout=TIMEOUT)
         put.raise_for_status()
-    assert get_object_size(dest) == (size, cksum)
+    assert await get_object_size(client, dest) == (size, cksum)
     # TODO return checksum also?
     return size
 
-def get_bucket_contents(bucket):
+async def get_bucket_contents(client, bucket):
     """Return each object in a bucket and its size"""
-    result = httpx.get(bucket, timeout=16)
+    result = await client.get(bucket, timeout=16)
     result.raise_for_status()
     return {k: (v['size'], v['checksum'])
             for k, v in result.json()["objects"].items()
             if not v['directory']}
 
-def replicate_bucket(source, dest):
+async def replicate_bucket(client, source, dest):
     """Replicate any missing objects"""
     # TODO do we still want a CLI way to invoke this?
-    source_contents = get_bucket_contents(source)
-    dest_contents = get_bucket_contents(dest)
+    source_contents = await get_bucket_contents(client, source)
+    dest_contents = await get_bucket_contents(client, dest)
     # NOTE this "size" is a tuple that includes also a sha256
     for obj, size in source_contents.items():
         if obj in dest_contents:
             assert size == dest_contents[obj]
             continue
         # TODO check checksum also? (need to convert it)
-        assert replicate_object(source + obj, dest + obj) == size[0]
+        assert await replicate_object(client, source + obj, dest + obj) == size[0]
 
-def auto_replica(locator, bucket, replicas, evacuate=()):
-    """Just figure out where to put stuff and do it
 
-    Replicas on servers in evacuate don't count toward the total and are
-    never chosen as a destination; they are only read as a last resort.
+class ServerSlots:
+    """Per-server semaphores, created on first use."""
+
+    def __init__(self, size):
+        self.size = size
+        self._slots = {}
+
+    def __call__(self, server):
+        if server not in self._slots:
+            self._slots[server] = asyncio.Semaphore(self.size)
+        return self._slots[server]
+
+
+class PlacementSnapshot:
+    """Where a run can put copies, shared by every object in it.
+
+    Holds one copy of the locator's /health and remembers which servers have
+    the bucket (each is HEADed once, when first a candidate), so placing N
+    objects costs O(servers) control requests rather than O(N * servers).
+    Bytes planned onto a server are debited from its quota-available-bytes,
+    and the snapshot is refetched after SNAPSHOT_TTL seconds or
+    SNAPSHOT_BYTES planned bytes so it never drifts far from the cluster.
+    """
+
+    def __init__(self, client, locator, bucket):
+        self.client = client
+        self.locator = locator
+        self.bucket = bucket
+        self.health = None
+        self.has_bucket = {}
+        self.fetched = 0
+        self.planned = 0
+        self._lock = asyncio.Lock()
+
+    async def refresh(self):
+        res = await self.client.get(self.locator + 'health', timeout=4)
+        res.raise_for_status()
+        self.health = {server: dict(stats) for server, stats in res.json()['servers'].items()}
+        self.has_bucket = {}
+        self.fetched = time.monotonic()
+        self.planned = 0
+
+    async def _check_bucket(self, server):
+        try:
+            result = await self.client.head(server + self.bucket + "/", timeout=1)
+            result.raise_for_status()
+            self.has_bucket[server] = True
+        except httpx.HTTPError:
+            self.has_bucket[server] = False
+
+    async def find_space(self, object_size, current, desired):
+        """Pick up to desired distinct servers for a copy and debit them; like find_space."""
+        async with self._lock:
+            if (self.health is None or self.planned >= SNAPSHOT_BYTES
+                    or time.monotonic() - self.fetched >= SNAPSHOT_TTL):
+                await self.refresh()
+            candidates = filter_write_candidates(self.health, object_size, exclude=current)
+            await asyncio.gather(*[self._check_bucket(server) for server in candidates
+                                   if server not in self.has_bucket])
+            candidates = {server: weight for server, weight in candidates.items()
+                          if self.has_bucket[server]}
+            chosen = []
+            while candidates and len(chosen) < desired:
+                server = random.choices(list(candidates), list(candidates.values()))[0]
+                del candidates[server]
+                chosen.append(server)
+                self.health[server]['quota-available-bytes'] -= object_size
+                self.planned += object_size
+            return chosen
+
+
+async def run_workers(jobs, worker, concurrency, priority=None):
+    """Feed jobs to concurrency copies of worker, lowest priority(job) first.
+
+    Jobs of equal priority (or all jobs, without priority) start in the
+    order given. The first exception stops the remaining workers and is
+    raised, as it was when objects were copied one at a time.
+    """
+    queue = asyncio.PriorityQueue()
+    for index, job in enumerate(jobs):
+        queue.put_nowait((priority(job) if priority else 0, index, job))
+
+    async def drain():
+        while not queue.empty():
+            await worker(queue.get_nowait()[2])
+
+    tasks = [asyncio.create_task(drain()) for _ in range(max(1, concurrency))]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def replication_risk(job):
+    """Priority of a replication job: the most exposed objects sort first.
+
+    The larger the replica deficit the sooner an object is copied, so one
+    held only on an evacuating node (no live copy) goes before one with a
+    single live copy, and so on. Smaller objects go first within a deficit,
+    protecting more objects sooner if a run is cut short.
     """
-    res = httpx.get(locator + bucket + '/', timeout=32)
+    _, obj, _, desired = job
+    return (-desired, obj['size'])
+
+
+async def replicate_bucket_objects(client, locator, bucket, replicas, evacuate=()):
+    """Bring every object in bucket up to replicas copies; False on any problem."""
+    res = await client.get(locator + bucket + '/', timeout=32)
     res.raise_for_status()
-    contents = res.json()
+    return await replicate_contents(client, locator, bucket, res.json()['objects'],
+                                    replicas, evacuate)
+
+async def replicate_contents(client, locator, bucket, objects, replicas, evacuate=()):
+    """Bring objects (a locator listing) up to replicas copies; False on any problem.
+
+    Objects are worked on CONCURRENCY at a time, most at risk first (see
+    replication_risk), with at most PER_SOURCE copies reading from and
+    PER_DEST copies writing to any one server.
+    """
     error = False
-    for name, obj in contents['objects'].items():
-        if obj['error'] or not obj['checksum']:
+    placement = PlacementSnapshot(client, locator, bucket)
+    sources = ServerSlots(PER_SOURCE)
+    dests = ServerSlots(PER_DEST)
+
+    async def copy(src_server, dst_server, name, size):
+        src = src_server + bucket + '/' + name
+        dst = dst_server + bucket + '/' + name
+        async with sources(src_server), dests(dst_server):
+            print(f"{src} => {dst}")
+            assert await replicate_object(client, src, dst) == size
+
+    async def replicate(item):
+        nonlocal error
+        name, obj, active, desired = item
+        spaces = await placement.find_space(obj['size'],
+                                            list(obj['locations']) + list(evacuate), desired)
+        if not spaces:
+            warnings.warn(f'No space to replicate object {name}')
+            error = True
+            return
+        if len(spaces) < desired:
+            warnings.warn('Not enough spaces but will still do some...')
+            error = True
+        await asyncio.gather(*[copy(random.choice(active or obj['locations']), run,
+                                    name, obj['size'])
+                               for run in spaces])
+
+    jobs = []
+    for name, obj in objects.items():
+        if obj['error'] or not obj['checksum'] or not obj['locations']:
             warnings.warn(f'Object {name} has an issue.')
             error = True
             continue
@@ -96,22 +407,156 @@ def auto_replica(locator, bucket, replicas, evacuate=()):
         desired = replicas - len(active)
         if desired < 1:
             continue
-        spaces = find_space(locator, bucket, obj['size'],
-                            list(obj['locations']) + list(evacuate), desired)
-        if not spaces:
-            warnings.warn(f'No space to replicate object {name}')
-            error = True
-            continue
-        if len(spaces) < desired:
-            warnings.warn('Not enough spaces but will still do some...')
-            error = True
-        for run in spaces:
-            src = random.choice(active or obj['locations']) + bucket + '/' + name
-            dst = run +  bucket + '/' + name
-            print(f"{src} => {dst}")
-            assert replicate_object(src, dst) == obj['size']
+        jobs.append((name, obj, active, desired))
+    await run_workers(jobs, replicate, CONCURRENCY, priority=replication_risk)
     return not error
 
+async def read_changes(client, server, bucket, checkpoint, collect=True):
+    """Follow server's change feed for bucket from checkpoint to its end.
+
+    Returns ({key: change record}, new checkpoint); without collect the
+    records are skipped and only the checkpoint is wanted. Raises
+    httpx.HTTPError if the server cannot answer.
+    """
+    offset = checkpoint.get('offset', 0)
+    file_id = checkpoint.get('file-id')
+    changed = {}
+    while True:
+        params = {'changes-since': offset, 'limit': CHANGES_PAGE}
+        if file_id:
+            params['file-id'] = file_id
+        res = await client.get(server + bucket + '/', params=params, timeout=16)
+        if res.status_code == 404:
+            return changed, {}
+        res.raise_for_status()
+        feed = res.json()
+        if collect:
+            for change in feed['changes']:
+                changed[change['key']] = change
+        offset, file_id = feed['offset'], feed['file-id']
+        if len(feed['changes']) < CHANGES_PAGE:
+            return changed, {'file-id': file_id, 'offset': offset}
+
+async def locate(client, locator, bucket, keys):
+    """{key: [servers]} from the locator's batch _locate; None if a server was unreachable."""
+    locations = {}
+    for start in range(0, len(keys), LOCATE_BATCH):
+        res = await client.post(locator + bucket + '/_locate', timeout=32,
+                                json={'keys': keys[start:start + LOCATE_BATCH]})
+        res.raise_for_status()
+        found = res.json()
+        if found['unreachable']:
+            return None
+        locations.update(found['locations'])
+    return locations
+
+def load_state(path):
+    """Checkpoint state saved by the last successful run, or {}."""
+    try:
+        with open(path, encoding='utf-8') as fp:
+            return json.load(fp)
+    except FileNotFoundError:
+        return {}
+
+def save_state(path, state):
+    """Replace the checkpoint state file atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fp:
+        json.dump(state, fp)
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(tmp, path)
+
+async def replicate_incremental(client, locator, bucket, replicas, evacuate, state_dir,
+                                full=False):
+    """Replicate only what the object servers committed since the last run.
+
+    Each server's change feed is read from the (file-id, offset) checkpoint
+    saved for the bucket, and only the keys in it are located and copied.
+    Every FULL_EVERY seconds the whole bucket is reconciled as well, and so
+    it is with full, without a checkpoint, when evacuating (every object on
+    the evacuated servers needs new copies, not just recent ones), when
+    replicas differs from the last run's, or when the set of object servers
+    does (copies lost with a dropped server show up in no change feed).
+    Checkpoints only advance after a run with no problems, so anything
+    skipped is looked at again next time.
+    """
+    path = os.path.join(state_dir, f"{bucket}.json")
+    state = load_state(path)
+    res = await client.get(locator + 'health', timeout=4)
+    res.raise_for_status()
+    servers = list(res.json()['servers'])
+    full = (full or not state or bool(evacuate) or state.get('replicas') != replicas
+            or set(servers) != set(state.get('servers', {}))
+            or time.time() - state.get('full', 0) > FULL_EVERY)
+    started = time.time()
+
+    async def follow(server):
+        try:
+            return await read_changes(client, server, bucket,
+                                      state.get('servers', {}).get(server, {}),
+                                      collect=not full)
+        except httpx.HTTPError:
+            warnings.warn(f'Cannot read the change feed of {server}')
+            return None
+
+    feeds = await asyncio.gather(*[follow(s) for s in servers])
+    if any(feed is None for feed in feeds):
+        return False
+    if full:
+        ok = await replicate_bucket_objects(client, locator, bucket, replicas, evacuate)
+    else:
+        changed = {}
+        for feed, _ in feeds:
+            changed.update(feed)
+        keys = [key for key, change in changed.items() if change['size'] is not None]
+        locations = await locate(client, locator, bucket, keys)
+        if locations is None:
+            warnings.warn('An object server could not be reached to locate changes')
+            return False
+        objects = {key: {'size': changed[key]['size'], 'checksum': changed[key]['checksum'],
+                         'locations': locations[key], 'error': False}
+                   for key in keys}
+        ok = await replicate_contents(client, locator, bucket, objects, replicas, evacuate)
+    if ok:
+        save_state(path, {'servers': {s: checkpoint for s, (_, checkpoint) in zip(servers, feeds)},
+                          'full': started if full else state['full'],
+                          'replicas': replicas})
+    return ok
+
+async def _auto_replica(locator, bucket, replicas, evacuate, state_dir, full):
+    # One pooled client for the whole run; connections are reused across objects.
+    limits = httpx.Limits(max_keepalive_connections=CONCURRENCY * 2)
+    # SIGHUP is handled on the loop, between tasks, rather than wherever the
+    # signal happens to interrupt; between runs cli's handler notes it.
+    loop = asyncio.get_running_loop()
+    previous = signal.getsignal(signal.SIGHUP)
+    loop.add_signal_handler(signal.SIGHUP, reload_limits)
+    try:
+        if _reload_pending:
+            reload_limits()
+        async with httpx.AsyncClient(limits=limits,
+                                     event_hooks={'request': [throttle_request]}) as client:
+            if state_dir:
+                return await replicate_incremental(client, locator, bucket, replicas,
+                                                   evacuate, state_dir, full)
+            return await replicate_bucket_objects(client, locator, bucket, replicas, evacuate)
+    finally:
+        loop.remove_signal_handler(signal.SIGHUP)
+        if previous is not None:
+            signal.signal(signal.SIGHUP, previous)
+
+def auto_replica(locator, bucket, replicas, evacuate=(), state_dir=None, full=False):
+    """Just figure out where to put stuff and do it
+
+    Replicas on servers in evacuate don't count toward the total and are
+    never chosen as a destination; they are only read as a last resort.
+    With state_dir, only objects committed since the last run are looked at
+    (see replicate_incremental); full forces a whole-bucket pass.
+    """
+    return asyncio.run(_auto_replica(locator, bucket, replicas, evacuate, state_dir, full))
+
 
 def cli():
     """CLI"""
@@ -122,6 +567,11 @@ def cli():
     parser.add_argument("--evac", action="append", default=[], metavar="SERVER_URL",
                         help="object server being evacuated: its replicas don't count"
                              " toward the total and it is never a copy target (repeatable)")
+    parser.add_argument("--state-dir", default=STATE_DIR, metavar="DIR",
+                        help="keep per-server change-feed checkpoints here and only"
+                             " replicate what changed since the last run")
+    parser.add_argument("--full", action="store_true",
+                        help="with --state-dir, reconcile the whole bucket this run")
     args = parser.parse_args()
 
     buckets = args.buckets or os.environ.get("BUCKETS", "").split()
@@ -129,15 +579,19 @@ def cli():
         parser.error("specify at least one bucket or set BUCKETS env var")
 
     evacuate = [url if url.endswith('/') else url + '/' for url in args.evac]
+    remember_env_file()
+    signal.signal(signal.SIGHUP, _note_reload)
 
     if args.replicas is not None:
-        results = [auto_replica(args.locator, b, args.replicas, evacuate) for b in buckets]
+        results = [auto_replica(args.locator, b, args.replicas, evacuate,
+                                state_dir=args.state_dir, full=args.full)
+                   for b in buckets]
     else:
         default_replicas = int(os.environ.get("REPLICAS", "2"))
         results = [
             auto_replica(args.locator, b,
                          int(os.environ.get(f"REPLICAS_{b.upper().replace('-', '_')}", default_replicas)),
-                         evacuate)
+                         evacuate, state_dir=args.state_dir, full=args.full)
             for b in buckets
         ]
     sys.exit(int(not all(results)))
@@ -1,9 +1,12 @@
 """Shared utilities for locator and replication modules."""
 
+import hashlib
+import math
 import os
 import pathlib
 import string
 import mimetypes
+import threading
 
 
 _HEX_CHARS = frozenset(string.hexdigits.lower())
@@ -39,6 +42,21 @@ def filter_write_candidates(health: dict, object_size: int, exclude=()) -> dict:
     }
 
 
+def rendezvous_rank(key: str, weights: dict) -> list:
+    """Return the servers in weights ordered by weighted rendezvous (HRW) score for key.
+
+    Each server scores -weight / ln(u), with u a hash of (server, key) in
+    (0, 1), so a server wins a share of keys proportional to its weight.
+    Adding or removing a server only moves the keys it wins or held, which
+    lets any locator recompute a key's likely home without shared state.
+    """
+    def score(server):
+        digest = hashlib.blake2b(f"{server}\0{key}".encode(), digest_size=8).digest()
+        u = (int.from_bytes(digest, 'big') + 0.5) / 2 ** 64
+        return -weights[server] / math.log(u)
+    return sorted(weights, key=score, reverse=True)
+
+
 def parse_checksum_line(line: str):
     """Return (hex_digest, filename) for a valid sha256sum line, else None.
 
@@ -69,6 +87,31 @@ def iter_checksum_file(path: pathlib.Path):
         pass
 
 
+def checksum_file_id(st: os.stat_result) -> str:
+    """Identity of a checksum file; changes when it is replaced, e.g. by scrub."""
+    return f"{st.st_dev}:{st.st_ino}"
+
+
+def read_checksum_tail(fp, offset: int, size: int, limit: int | None = None):
+    """Parse complete lines in bytes [offset, size) of a binary checksum file.
+
+    Returns ([(digest, filename), ...], end_offset). A trailing line without
+    its newline is left for the next call, as is everything after the
+    limit-th valid line.
+    """
+    entries = []
+    fp.seek(offset)
+    while offset < size and (limit is None or len(entries) < limit):
+        line = fp.readline(size - offset)
+        if not line.endswith(b'\n'):
+            break
+        offset += len(line)
+        parsed = parse_checksum_line(line.decode('utf-8', errors='replace'))
+        if parsed is not None:
+            entries.append(parsed)
+    return entries, offset
+
+
 class ChecksumFile:
     """Handle for a bucket's <name>.sha256 file."""
 
@@ -95,10 +138,86 @@ class ChecksumFile:
         The single O_APPEND os.write() is atomic against concurrent appenders (POSIX),
         so different-key PUTs in the same bucket need no extra serialisation.
         """
-        cksum_line = f"{digest.hex()}  {key}\n"
+        self.append_many([(key, digest)])
+
+    def append_many(self, entries) -> None:
+        """Durably append one line per (key, digest) with one write and one fsync."""
+        cksum_lines = "".join(f"{digest.hex()}  {key}\n" for key, digest in entries)
         fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
         try:
-            os.write(fd, cksum_line.encode())
+            os.write(fd, cksum_lines.encode())
             os.fsync(fd)
         finally:
             os.close(fd)
+
+
+class ChecksumIndex:
+    """In-memory {key: digest} view of a <bucket>.sha256 file.
+
+    Built once from the whole file, then kept current by reading only the
+    bytes appended since the last refresh. The file's (st_dev, st_ino) is
+    remembered so a rewrite (scrub --repair-checksums) or truncation triggers
+    a full rebuild. Only complete, newline-terminated lines are consumed; a
+    line still being appended is picked up on the next refresh.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._ident = None
+        self._offset = 0
+
+    def _reset(self, ident=None):
+        self._entries = {}
+        self._ident = ident
+        self._offset = 0
+
+    def refresh(self) -> None:
+        """Fold any newly appended lines into the index."""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset()
+                return
+            if (st.st_dev, st.st_ino) == self._ident and st.st_size == self._offset:
+                return
+            try:
+                fp = open(self.path, 'rb')
+            except FileNotFoundError:
+                self._reset()
+                return
+            with fp:
+                # Re-stat the opened file: it may have been replaced since.
+                st = os.fstat(fp.fileno())
+                ident = (st.st_dev, st.st_ino)
+                if ident != self._ident or st.st_size < self._offset:
+                    self._reset(ident)
+                entries, self._offset = read_checksum_tail(fp, self._offset, st.st_size)
+            for digest, filename in entries:
+                # First line wins, matching ChecksumFile.lookup.
+                self._entries.setdefault(filename, bytes.fromhex(digest))
+
+    def lookup(self, key: str):
+        """Return bytes digest for key, or None."""
+        self.refresh()
+        return self._entries.get(key)
+
+    def get(self, key: str):
+        """Return bytes digest for key as of the last refresh, or None."""
+        return self._entries.get(key)
+
+
+_checksum_indexes = {}
+_checksum_indexes_lock = threading.Lock()
+
+
+def checksum_index(bucket_dir: pathlib.Path) -> ChecksumIndex:
+    """Return the process-wide ChecksumIndex for a bucket directory."""
+    path = ChecksumFile(bucket_dir).path
+    with _checksum_indexes_lock:
+        index = _checksum_indexes.get(path)
+        if index is None:
+            index = _checksum_indexes[path] = ChecksumIndex(path)
+    return index
@@ -1,26 +1,372 @@
 """Simpler Objects Locator API"""
 
 import asyncio
+import heapq
+import json
+import logging
 import os
 import random
+import time
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from itertools import islice
 from typing import Annotated
 import httpx
 from fastapi import FastAPI, HTTPException, Header
-from fastapi.responses import RedirectResponse, Response
-from simpler_objects.common import check_content_type_extension, filter_write_candidates
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from simpler_objects.common import (check_content_type_extension, filter_write_candidates,
+                                    rendezvous_rank)
+
+logger = logging.getLogger(__name__)
 
 OBJECT_SERVERS = os.environ.get('OBJECT_SERVERS', 'http://localhost:46579/')
 
 # Fallback Retry-After on a busy 503; matches the object server's own constant.
 RETRY_AFTER = "64"
 
+# Where recently found objects live, so a hot key skips the HEAD fan-out.
+# Objects are immutable, but one can still vanish from a server that stays up
+# (a replaced disk, scrub --delete-victims), so a positive entry older than
+# LOCATION_CACHE_VERIFY_AFTER seconds is confirmed with a HEAD to the cached
+# server (one round trip instead of the fan-out) before redirecting to it.
+# A 404 is remembered briefly to absorb repeated probes.
+LOCATION_CACHE_SIZE = int(os.environ.get('LOCATION_CACHE_SIZE', '65536'))
+LOCATION_CACHE_TTL = float(os.environ.get('LOCATION_CACHE_TTL', '300'))
+LOCATION_CACHE_NEGATIVE_TTL = float(os.environ.get('LOCATION_CACHE_NEGATIVE_TTL', '2'))
+LOCATION_CACHE_VERIFY_AFTER = float(os.environ.get('LOCATION_CACHE_VERIFY_AFTER', '5'))
+# Set to any non-empty string to verify every hit, however recent.
+LOCATION_CACHE_VERIFY = bool(os.environ.get('LOCATION_CACHE_VERIFY', ''))
+
+# How find_object probes servers for a key: 'sequential' (one at a time, in
+# random order), 'hedged' (LOOKUP_HEDGE_FIRST at once, the rest after
+# LOOKUP_HEDGE_DELAY seconds or as soon as one of those misses) or 'parallel'
+# (all at once). The first 200 wins and outstanding probes are cancelled.
+LOOKUP_MODE = os.environ.get('LOOKUP_MODE', 'sequential')
+LOOKUP_HEDGE_FIRST = int(os.environ.get('LOOKUP_HEDGE_FIRST', '2'))
+LOOKUP_HEDGE_DELAY = float(os.environ.get('LOOKUP_HEDGE_DELAY', '0.05'))
+
+# Where add_object puts a new key: 'random' (weighted by free space) or
+# 'rendezvous' (highest-random-weight hashing, with the same weights). With
+# 'rendezvous' find_object probes the key's top-ranked servers first.
+PLACEMENT = os.environ.get('PLACEMENT', 'random')
+
+# Object-server /health is polled in the background every HEALTH_INTERVAL
+# seconds (0 disables the poller). A snapshot entry older than HEALTH_MAX_AGE
+# is not trusted and is re-fetched on the request path instead.
+HEALTH_INTERVAL = float(os.environ.get('HEALTH_INTERVAL', '5'))
+HEALTH_MAX_AGE = float(os.environ.get('HEALTH_MAX_AGE', '15'))
+
+# Per-server circuit breaker: after CIRCUIT_ERRORS consecutive failures
+# (0 disables it) a server is skipped, except for one trial request every
+# CIRCUIT_RESET seconds; a success closes the circuit again. Latency is an
+# EWMA with weight LATENCY_EWMA_ALPHA on the newest sample.
+CIRCUIT_ERRORS = int(os.environ.get('CIRCUIT_ERRORS', '3'))
+CIRCUIT_RESET = float(os.environ.get('CIRCUIT_RESET', '10'))
+LATENCY_EWMA_ALPHA = float(os.environ.get('LATENCY_EWMA_ALPHA', '0.2'))
+
+# Bytes redirected to a server by a PUT count against its free space until
+# the object is seen there or RESERVATION_TTL seconds pass. The health poller
+# HEADs up to RESERVATION_SWEEP of the oldest ones per round to spot commits.
+# UPLOADS_PER_SERVER caps reserved (in-flight) PUTs per server; 0 is no cap.
+RESERVATION_TTL = float(os.environ.get('RESERVATION_TTL', '300'))
+RESERVATION_SWEEP = int(os.environ.get('RESERVATION_SWEEP', '256'))
+UPLOADS_PER_SERVER = int(os.environ.get('UPLOADS_PER_SERVER', '0'))
+# Retry-After on the 503 when every candidate is at UPLOADS_PER_SERVER.
+UPLOAD_RETRY_AFTER = "5"
+
+# Merged listings of up to LISTING_CACHE_BUCKETS buckets are kept, one shard
+# per server, and revalidated with If-None-Match so only changed shards are
+# re-fetched and re-merged (0 disables the cache). A listing revalidated
+# within LISTING_FRESH seconds is served as is; within LISTING_STALE it is
+# served at once and revalidated behind the response; older, it is
+# revalidated before responding. Off by default: every cached bucket's full
+# listing stays in memory (shards, merged dict and JSON body), and served
+# listings may be up to LISTING_STALE seconds old.
+LISTING_CACHE_BUCKETS = int(os.environ.get('LISTING_CACHE_BUCKETS', '0'))
+LISTING_FRESH = float(os.environ.get('LISTING_FRESH', '1'))
+LISTING_STALE = float(os.environ.get('LISTING_STALE', '5'))
+
+# Most keys accepted by one _locate or _place request.
+BATCH_LIMIT = int(os.environ.get('BATCH_LIMIT', '10000'))
+
+# Reported for a server whose /health cannot be fetched.
+DOWN = {'write': False, 'read': False, 'quota-available-bytes': 0, 'quota-used-bytes': 0, 'percent': 0}
+
+
+class LocationCache:
+    """Bounded LRU of object path -> server URL, or None for a recent 404."""
+
+    def __init__(self, size: int, ttl: float, negative_ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+
+    def get(self, object_path: str):
+        """Return (hit, server, age); a hit with server None is a cached 404."""
+        entry = self._entries.get(object_path)
+        if entry is None:
+            return False, None, None
+        server, stored, expires = entry
+        now = time.monotonic()
+        if expires <= now:
+            del self._entries[object_path]
+            return False, None, None
+        self._entries.move_to_end(object_path)
+        return True, server, now - stored
+
+    def _store(self, object_path: str, server, ttl: float):
+        if self.size <= 0 or ttl <= 0:
+            return
+        now = time.monotonic()
+        self._entries[object_path] = (server, now, now + ttl)
+        self._entries.move_to_end(object_path)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def found(self, object_path: str, server: str):
+        self._store(object_path, server, self.ttl)
+
+    def missing(self, object_path: str):
+        self._store(object_path, None, self.negative_ttl)
+
+    def discard(self, object_path: str):
+        self._entries.pop(object_path, None)
+
+
+class HealthSnapshot:
+    """Last known /health of each object server, and buckets seen on it.
+
+    Kept fresh by poll_health; readers get DOWN-free entries only while they
+    are younger than HEALTH_MAX_AGE. invalidate() marks a server down at once
+    when a request to it fails, until the next successful poll.
+    """
+
+    def __init__(self):
+        self._health = {}
+        self._buckets = {}
+
+    def update(self, server: str, health: dict):
+        self._health[server] = (health, time.monotonic())
+
+    def invalidate(self, server: str):
+        self.update(server, dict(DOWN))
+        for server_bucket in [sb for sb in self._buckets if sb[0] == server]:
+            del self._buckets[server_bucket]
+
+    def get(self, server: str):
+        """Return the server's health, or None if unknown or too old."""
+        entry = self._health.get(server)
+        if entry is None or time.monotonic() - entry[1] > HEALTH_MAX_AGE:
+            return None
+        return entry[0]
+
+    def bucket_seen(self, server: str, bucket: str):
+        self._buckets[(server, bucket)] = time.monotonic()
+
+    def has_bucket(self, server: str, bucket: str) -> bool:
+        seen = self._buckets.get((server, bucket))
+        return seen is not None and time.monotonic() - seen <= HEALTH_MAX_AGE
+
+
+class Reservations:
+    """PUTs redirected to each server and not yet seen committed there.
+
+    Entries are kept oldest first; all share RESERVATION_TTL, so expiry only
+    ever looks at the front. Per-server totals are kept incrementally.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._bytes = {}
+        self._uploads = {}
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._entries:
+            object_path, (_, _, expires) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            self.release(object_path)
+
+    def add(self, object_path: str, server: str, size: int):
+        self.release(object_path)
+        self._entries[object_path] = (server, size, time.monotonic() + RESERVATION_TTL)
+        self._bytes[server] = self._bytes.get(server, 0) + size
+        self._uploads[server] = self._uploads.get(server, 0) + 1
+
+    def release(self, object_path: str, server: str | None = None):
+        """Drop object_path's reservation (only if it is on server, when given)."""
+        entry = self._entries.get(object_path)
+        if entry is None or server not in (None, entry[0]):
+            return
+        del self._entries[object_path]
+        self._bytes[entry[0]] -= entry[1]
+        self._uploads[entry[0]] -= 1
+
+    def reserved(self, server: str) -> int:
+        self._expire()
+        return self._bytes.get(server, 0)
+
+    def uploads(self, server: str) -> int:
+        self._expire()
+        return self._uploads.get(server, 0)
+
+    def oldest(self, limit: int):
+        """Return up to limit (object_path, server) pairs, oldest first."""
+        self._expire()
+        return [(path, entry[0]) for path, entry in islice(self._entries.items(), limit)]
+
+
+class BucketListing:
+    """One bucket's merged listing, kept per server shard.
+
+    apply() replaces one server's shard and re-merges only the keys whose
+    entries on that server changed.
+    """
+
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+        self.shards = {}
+        self.replicas = {}
+        self.objects = {}
+        self.checked = None
+        self.refresh = None
+        self._body = None
+
+    def etag(self, server: str):
+        return self.shards.get(server, (None, {}))[0]
+
+    def apply(self, server: str, etag: str | None, objects: dict, servers):
+        """Install server's listing (objects, validator etag) as its shard."""
+        old = self.shards.get(server, (None, {}))[1]
+        self.shards[server] = (etag, objects)
+        touched = [key for key in old if key not in objects]
+        touched += [key for key, value in objects.items() if old.get(key) != value]
+        for key in touched:
+            found = self.replicas.setdefault(key, {})
+            if key in objects:
+                found[server] = objects[key]
+            else:
+                found.pop(server, None)
+            if not found:
+                del self.replicas[key]
+                self.objects.pop(key, None)
+                continue
+            self.objects[key] = merge_replicas(
+                [(s, found[s]) for s in servers if s in found])
+        if touched:
+            self._body = None
+
+    def drop(self, server: str, servers):
+        """Forget a server that is no longer configured."""
+        if server in self.shards:
+            self.apply(server, None, {}, servers)
+            del self.shards[server]
+
+    def body(self) -> bytes:
+        """The merged listing as JSON, serialised once per change."""
+        if self._body is None:
+            self._body = json.dumps({'bucket': self.bucket, 'objects': self.objects}).encode()
+        return self._body
+
+
+class CircuitOpen(httpx.HTTPError):
+    """Raised instead of sending a request to a server whose circuit is open."""
+
+
+class ServerStats:
+    """EWMA latency and circuit-breaker state of each object server."""
+
+    def __init__(self):
+        self.latency = {}
+        self.errors = {}
+        self._opened = {}
+
+    def record(self, server: str, elapsed: float, ok: bool):
+        previous = self.latency.get(server)
+        self.latency[server] = elapsed if previous is None else (
+            previous + LATENCY_EWMA_ALPHA * (elapsed - previous))
+        if ok:
+            self.errors[server] = 0
+            self._opened.pop(server, None)
+            return
+        self.errors[server] = self.errors.get(server, 0) + 1
+        if CIRCUIT_ERRORS and self.errors[server] >= CIRCUIT_ERRORS:
+            self._opened[server] = time.monotonic()
+
+    def is_open(self, server: str) -> bool:
+        """True while the server is to be skipped outright."""
+        opened = self._opened.get(server)
+        return opened is not None and time.monotonic() - opened < CIRCUIT_RESET
+
+    def allow(self, server: str) -> bool:
+        """Whether to send a request now; claims the half-open trial if due."""
+        if self.is_open(server):
+            return False
+        if server in self._opened:
+            # Half-open: this request is the trial. Re-arm so concurrent
+            # requests keep skipping the server until it answers.
+            self._opened[server] = time.monotonic()
+        return True
+
+    def order(self, servers):
+        """Return servers whose circuit is not open, fastest first."""
+        return sorted((s for s in servers if not self.is_open(s)),
+                      key=lambda s: self.latency.get(s, 0.0))
+
+
+async def poll_health(snapshot: HealthSnapshot, reservations: Reservations):
+    """Refresh every server's snapshot entry forever, every HEALTH_INTERVAL.
+
+    Each round also checks the oldest reservations, so the space and upload
+    slots of finished PUTs are released well before RESERVATION_TTL. A round
+    that fails is logged and the next one runs as usual: a dead poller would
+    silently leave every request on the per-request fan-out.
+    """
+    while True:
+        try:
+            await refresh_health(snapshot, object_servers())
+            await sweep_reservations(reservations)
+        except Exception:
+            logger.exception("Health poll round failed")
+        await asyncio.sleep(HEALTH_INTERVAL)
+
+
+async def sweep_reservations(reservations: Reservations):
+    """Release reservations whose object is now on its server."""
+    async def committed(object_path, server):
+        try:
+            result = await server_request('HEAD', server, object_path, timeout=1)
+        except httpx.HTTPError:
+            return False
+        return result.status_code == 200
+
+    pending = reservations.oldest(RESERVATION_SWEEP)
+    found = await asyncio.gather(*[committed(path, server) for path, server in pending])
+    for (object_path, server), done in zip(pending, found):
+        if done:
+            reservations.release(object_path, server)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage the lifecycle of the shared object-server HTTP client."""
     # One pooled client for the whole app, reused across all requests.
     app.state.client = httpx.AsyncClient()
+    app.state.location_cache = LocationCache(
+        LOCATION_CACHE_SIZE, LOCATION_CACHE_TTL, LOCATION_CACHE_NEGATIVE_TTL)
+    app.state.health = HealthSnapshot()
+    app.state.server_stats = ServerStats()
+    app.state.reservations = Reservations()
+    app.state.listings = OrderedDict()
+    poller = None
+    if HEALTH_INTERVAL > 0:
+        poller = asyncio.create_task(poll_health(app.state.health, app.state.reservations))
     yield
+    if poller is not None:
+        poller.cancel()
     await app.state.client.aclose()
 
 app = FastAPI(lifespan=lifespan)
@@ -32,52 +378,194 @@ def object_servers(randomized=False):
         random.shuffle(servers)
     return servers
 
+async def server_request(method: str, server: str, path: str, timeout: float,
+                         stream: bool = False, **kwargs):
+    """Send a request to an object server, tracking its latency and errors.
+
+    Raises CircuitOpen, an httpx.HTTPError, without sending anything while
+    the server's circuit is open. With stream, the body is left unread and
+    the caller must aclose() the response.
+    """
+    stats = app.state.server_stats
+    if not stats.allow(server):
+        raise CircuitOpen(f"circuit open for {server}")
+    start = time.monotonic()
+    try:
+        client = app.state.client
+        request = client.build_request(method, server + path, timeout=timeout, **kwargs)
+        result = await client.send(request, stream=stream)
+    except httpx.HTTPError:
+        stats.record(server, time.monotonic() - start, False)
+        raise
+    # A 503 is a busy object or full disk, answered promptly by a live server.
+    ok = result.status_code < 500 or result.status_code == 503
+    stats.record(server, time.monotonic() - start, ok)
+    return result
+
 async def get_object_server_health(url: str):
     """Get the health of an object server"""
-    client = app.state.client
     try:
-        result = await client.get(url + 'health', timeout=1)
+        result = await server_request('GET', url, 'health', timeout=1)
         result.raise_for_status()
-    except httpx.HTTPError:
-        return {'write': False, 'read': False, 'quota-available-bytes': 0, 'quota-used-bytes': 0, 'percent': 0}
-    return result.json()
+        return result.json()
+    except (httpx.HTTPError, ValueError):
+        return dict(DOWN)
+
+async def refresh_health(snapshot: HealthSnapshot, servers):
+    """Fetch /health from servers concurrently into the snapshot."""
+    healths = await asyncio.gather(*[get_object_server_health(s) for s in servers])
+    for server, health in zip(servers, healths):
+        snapshot.update(server, health)
+
+async def cluster_health(servers) -> dict:
+    """Return {server: health}, from the snapshot where it is fresh enough.
+
+    Servers missing from the snapshot or older than HEALTH_MAX_AGE (cold
+    start, poller disabled or stuck) are fetched here, on the request path.
+    """
+    snapshot = app.state.health
+    stale = [s for s in servers if snapshot.get(s) is None]
+    if stale:
+        await refresh_health(snapshot, stale)
+    return {s: snapshot.get(s) or dict(DOWN) for s in servers}
 
 @app.get('/health')
 async def healthcheck():
     """Return basic info on cluster health"""
-    servers = object_servers()
-    healths = await asyncio.gather(*[get_object_server_health(s) for s in servers])
-    return {'servers': dict(zip(servers, healths))}
+    return {'servers': await cluster_health(object_servers())}
+
+def usable_location(server: str) -> bool:
+    """Whether a cached location on server may be redirected to.
+
+    Not while its circuit is open, nor while the health snapshot (including
+    an invalidate() after a failed request) says it cannot be read from.
+    """
+    if app.state.server_stats.is_open(server):
+        return False
+    health = app.state.health.get(server)
+    return health is None or health['read']
 
 @app.api_route("/{bucket}/{key}", methods=["GET", "HEAD"])
 async def find_object(bucket: str, key: str):
     """Return a redirect to an existing object"""
     object_path = f"{bucket}/{key}"
+    cache = app.state.location_cache
+    hit, cached, age = cache.get(object_path)
+    if hit and cached is None:
+        raise HTTPException(status_code=404)
+    if hit and cached in object_servers() and usable_location(cached):
+        if not LOCATION_CACHE_VERIFY and age < LOCATION_CACHE_VERIFY_AFTER:
+            return RedirectResponse(url=cached + object_path)
+        try:
+            result = await server_request('HEAD', cached, object_path, timeout=1)
+            if result.status_code == 200:
+                cache.found(object_path, cached)
+                return RedirectResponse(url=cached + object_path)
+        except httpx.HTTPError:
+            pass
+    cache.discard(object_path)
+    # Shuffled first so servers of equal (or unknown) latency share the load.
+    servers = app.state.server_stats.order(object_servers(randomized=True))
+    if PLACEMENT == 'rendezvous':
+        servers = placement_order(object_path, servers)
+    if LOOKUP_MODE == 'sequential':
+        found, answers = await sequential_lookup(servers, object_path)
+    else:
+        first = LOOKUP_HEDGE_FIRST if LOOKUP_MODE == 'hedged' else len(servers)
+        found, answers = await hedged_lookup(servers, object_path, first)
+    if found is not None:
+        cache.found(object_path, found)
+        app.state.reservations.release(object_path, found)
+        return RedirectResponse(url=found + object_path)
     # Only an explicit 503 from a reachable server is evidence the object
-    # exists (a PUT is in progress); a timeout or transport error is the
-    # absence of an answer, not proof, so it must not escalate to 503 — unlike
+    # exists (a PUT is in progress); a timeout, transport error or open circuit
+    # is the absence of an answer, not proof, so it must not escalate to 503 — unlike
     # head_bucket, which answers a coarser question and may treat any error as
     # 503. Escalating every transport failure would mask genuine 404s as
     # "retry forever" whenever any node in the fleet is flaky.
     busy = False
     retry_after = None
-    client = app.state.client
-    # Sequential by design: randomised order spreads load; first healthy server wins.
-    for server in object_servers(randomized=True):
-        try:
-            result = await client.head(server + object_path, timeout=1)
-        except httpx.HTTPError:
-            continue
-        if result.status_code == 200:
-            return RedirectResponse(url=server + object_path)
-        if result.status_code == 503:
+    for result in answers:
+        if result is not None and result.status_code == 503:
             busy = True
             retry_after = result.headers.get("Retry-After", retry_after)
     if busy:
         raise HTTPException(status_code=503,
                             headers={"Retry-After": retry_after or RETRY_AFTER})
+    # Only a 404 from every server is cached; a miss with any server silent
+    # may just be that server's blip.
+    if len(answers) == len(object_servers()) and all(
+            result is not None and result.status_code == 404 for result in answers):
+        cache.missing(object_path)
     raise HTTPException(status_code=404)
 
+def placement_order(object_path: str, servers):
+    """Put the servers rendezvous placement would pick for object_path first.
+
+    Weights come from the health snapshot as it is now, not as it was at PUT
+    time; weighted HRW moves few keys as free space shifts, so the top-ranked
+    server is still usually right. Servers not eligible for writes (or with
+    no fresh health) follow in their given order.
+    """
+    snapshot = app.state.health
+    health = {s: snapshot.get(s) for s in servers}
+    weights = filter_write_candidates({s: h for s, h in health.items() if h}, 0)
+    if not weights:
+        weights = dict.fromkeys(servers, 1)
+    return rendezvous_rank(object_path, weights) + [s for s in servers if s not in weights]
+
+async def probe_object(server: str, object_path: str):
+    """HEAD one replica; return (server, response), response None if unreachable."""
+    try:
+        return server, await server_request('HEAD', server, object_path, timeout=1)
+    except httpx.HTTPError:
+        return server, None
+
+async def sequential_lookup(servers, object_path):
+    """Probe servers one at a time; return (server with a 200 or None, other answers)."""
+    answers = []
+    # Sequential by design: fastest servers first; first healthy server wins.
+    for server in servers:
+        server, result = await probe_object(server, object_path)
+        if result is not None and result.status_code == 200:
+            return server, answers
+        answers.append(result)
+    return None, answers
+
+async def hedged_lookup(servers, object_path, first: int):
+    """Probe the first servers at once, hedging onto the rest.
+
+    The remaining servers are probed once LOOKUP_HEDGE_DELAY passes without
+    a 200, or straight away when an early probe misses. Returns like
+    sequential_lookup; on a 200 the outstanding probes are cancelled.
+    """
+    waiting = list(servers)
+    pending = set()
+    answers = []
+
+    def launch(count):
+        for server in waiting[:count]:
+            pending.add(asyncio.create_task(probe_object(server, object_path)))
+        del waiting[:count]
+
+    launch(max(first, 1))
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=LOOKUP_HEDGE_DELAY if waiting else None,
+                return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                server, result = task.result()
+                if result is not None and result.status_code == 200:
+                    return server, answers
+                answers.append(result)
+            # Hedge: the delay ran out, or a probe came back empty-handed.
+            launch(len(waiting))
+    finally:
+        for task in pending:
+            task.cancel()
+    return None, answers
+
 @app.put("/{bucket}/{key}")
 async def add_object(bucket: str, key: str,
                      content_length: Annotated[int | None, Header()] = None,
@@ -88,45 +576,54 @@ async def add_object(bucket: str, key: str,
     if not check_content_type_extension(key, content_type):
         raise HTTPException(status_code=415)
     object_path = f"{bucket}/{key}"
-    # TODO use caches of objects and servers but then double check vs checking everybody
+    # A remembered 404 for this key is about to stop being true.
+    app.state.location_cache.discard(object_path)
     all_obj_servers = object_servers()
-    client = app.state.client
+    snapshot = app.state.health
+    reservations = app.state.reservations
 
     async def check_exists(server):
         try:
-            result = await client.head(server + object_path, timeout=1)
+            result = await server_request('HEAD', server, object_path, timeout=1)
             return server, result.status_code
         except httpx.HTTPError:
             return server, None
 
-    # Health and existence are independent fan-outs over every server, so they
-    # run concurrently. Existence must cover all servers, not just writable
-    # candidates: the object must not already exist anywhere in the cluster.
-    health_fut = asyncio.gather(*[get_object_server_health(s) for s in all_obj_servers])
+    # Health normally comes from the background poller's snapshot, so only
+    # the existence fan-out is on the critical path. Existence must cover all
+    # servers, not just writable candidates: the object must not already
+    # exist anywhere in the cluster.
+    health_fut = cluster_health(all_obj_servers)
     exist_fut = asyncio.gather(*[check_exists(s) for s in all_obj_servers])
-    healths = await health_fut
+    health = await health_fut
     exist_results = await exist_fut
 
-    health = dict(zip(all_obj_servers, healths))
-    candidates = filter_write_candidates(health, content_length)
+    # Space already promised to redirected, uncommitted PUTs is not free.
+    candidates = filter_write_candidates(unreserved_health(health), content_length)
     for server, status in exist_results:
         if status == 404:
             continue
         if status in (200, 503):
             raise HTTPException(status_code=409)
-        # None or unexpected status (e.g. 500): server broken or unreachable
+        # None or unexpected status (e.g. 500): server broken or unreachable.
+        # Don't offer it to other PUTs either until the poller sees it again.
         candidates.pop(server, None)
+        snapshot.invalidate(server)
 
     async def check_bucket(server):
+        if snapshot.has_bucket(server, bucket):
+            return server, True
         try:
-            result = await client.head(server + bucket + "/", timeout=1)
+            result = await server_request('HEAD', server, bucket + "/", timeout=1)
             result.raise_for_status()
-            return server, True
         except httpx.HTTPError:
             return server, False
+        snapshot.bucket_seen(server, bucket)
+        return server, True
 
     # Final stage: verify the bucket exists on each surviving candidate. It must
-    # follow the stage above — it depends on the pruned candidate set.
+    # follow the stage above — it depends on the pruned candidate set. Buckets
+    # recently seen on a server are taken from the snapshot.
     bucket_results = await asyncio.gather(*[check_bucket(s) for s in list(candidates.keys())])
     for server, ok in bucket_results:
         if not ok:
@@ -134,9 +631,145 @@ async def add_object(bucket: str, key: str,
 
     if not candidates:
         raise HTTPException(507)
-    server_to_upload = random.choices(list(candidates.keys()), list(candidates.values()))[0]
+    candidates = below_upload_cap(candidates, reservations)
+    if not candidates:
+        # Space exists, but every server with it is busy: try again soon.
+        raise HTTPException(503, headers={"Retry-After": UPLOAD_RETRY_AFTER})
+    server_to_upload = choose_server(object_path, candidates)
+    reservations.add(object_path, server_to_upload, content_length)
     return RedirectResponse(url=server_to_upload+object_path)
 
+def below_upload_cap(candidates: dict, reservations: Reservations) -> dict:
+    """candidates without the servers already taking UPLOADS_PER_SERVER PUTs."""
+    if UPLOADS_PER_SERVER <= 0:
+        return candidates
+    return {server: weight for server, weight in candidates.items()
+            if reservations.uploads(server) < UPLOADS_PER_SERVER}
+
+def choose_server(object_path: str, candidates: dict) -> str:
+    """Pick the server for a new object from {server: weight}, per PLACEMENT."""
+    if PLACEMENT == 'rendezvous':
+        return rendezvous_rank(object_path, candidates)[0]
+    return random.choices(list(candidates.keys()), list(candidates.values()))[0]
+
+def unreserved_health(health: dict) -> dict:
+    """Return health with space promised to uncommitted PUTs taken off."""
+    reservations = app.state.reservations
+    return {server: dict(stats, **{'quota-available-bytes':
+                                   stats['quota-available-bytes'] - reservations.reserved(server)})
+            for server, stats in health.items()}
+
+class LocateRequest(BaseModel):
+    keys: list[str] = Field(max_length=BATCH_LIMIT)
+
+class PlaceObject(BaseModel):
+    key: str
+    size: int = Field(ge=0)
+
+class PlaceRequest(BaseModel):
+    objects: list[PlaceObject] = Field(max_length=BATCH_LIMIT)
+
+async def bucket_stat(bucket: str, keys):
+    """Ask every server about keys with one POST /{bucket}/_stat each.
+
+    Returns [(server, {key: stat} for the keys it holds or None if it has no
+    such bucket, answered)]; a server that could not answer has answered
+    False. A server without _stat (405) is listed instead, narrowed to the
+    keys' common prefix, and its keys are reported not busy.
+    """
+    keys = list(keys)
+
+    async def fetch(server):
+        listed = False
+        try:
+            result = await server_request('POST', server, f"{bucket}/_stat", timeout=16,
+                                          json={'keys': keys})
+            if result.status_code == 405:
+                listed = True
+                result = await server_request('GET', server, bucket + '/', timeout=16,
+                                              params={'prefix': os.path.commonprefix(keys)})
+            if result.status_code == 404:
+                return server, None, True
+            result.raise_for_status()
+        except httpx.HTTPError:
+            return server, None, False
+        objects = result.json()['objects']
+        if listed:
+            wanted = set(keys)
+            return server, {k: dict(info, busy=False) for k, info in objects.items()
+                            if k in wanted and not info['directory']}, True
+        return server, {k: info for k, info in objects.items() if info is not None}, True
+
+    return await asyncio.gather(*[fetch(s) for s in object_servers()])
+
+@app.post("/{bucket}/_locate")
+async def locate_objects(bucket: str, request: LocateRequest):
+    """Return the servers holding each of many keys, with one request per server
+
+    A replica still being written (busy) is not a location yet.
+    """
+    stats = await bucket_stat(bucket, request.keys)
+    cache = app.state.location_cache
+    everyone_answered = all(answered for _, _, answered in stats)
+    locations = {}
+    for key in request.keys:
+        held = [(server, objects[key]) for server, objects, _ in stats
+                if objects and key in objects]
+        locations[key] = [server for server, info in held if not info['busy']]
+        if locations[key]:
+            cache.found(f"{bucket}/{key}", locations[key][0])
+        elif everyone_answered and not held:
+            cache.missing(f"{bucket}/{key}")
+    return {'bucket': bucket, 'locations': locations,
+            'unreachable': [server for server, _, answered in stats if not answered]}
+
+@app.post("/{bucket}/_place")
+async def place_objects(bucket: str, request: PlaceRequest):
+    """Pick a server for each of many new objects, with one request per server
+
+    Each placement is reserved before the next is made, so a batch spreads
+    over the cluster as its free space and UPLOADS_PER_SERVER slots are used
+    up. Objects there is room for, but only on servers at the upload cap, are
+    listed in retry rather than unplaced.
+    """
+    all_obj_servers = object_servers()
+    health_fut = cluster_health(all_obj_servers)
+    stat_fut = bucket_stat(bucket, [obj.key for obj in request.objects])
+    health = await health_fut
+    stats = await stat_fut
+    existing = set()
+    for server, objects, _ in stats:
+        if objects is None:
+            # No bucket there, or no answer: not a place for new objects.
+            health.pop(server, None)
+        else:
+            # Busy keys too: a PUT of them is already under way.
+            existing |= objects.keys()
+    reservations = app.state.reservations
+    placements = {}
+    conflicts = []
+    unplaced = []
+    retry = []
+    for obj in request.objects:
+        object_path = f"{bucket}/{obj.key}"
+        if obj.key in existing or obj.key in placements:
+            conflicts.append(obj.key)
+            continue
+        app.state.location_cache.discard(object_path)
+        candidates = filter_write_candidates(unreserved_health(health), obj.size)
+        if not candidates:
+            unplaced.append(obj.key)
+            continue
+        candidates = below_upload_cap(candidates, reservations)
+        if not candidates:
+            retry.append(obj.key)
+            continue
+        server = choose_server(object_path, candidates)
+        reservations.add(object_path, server, obj.size)
+        placements[obj.key] = server + object_path
+    return {'bucket': bucket, 'placements': placements,
+            'conflicts': conflicts, 'unplaced': unplaced, 'retry': retry}
+
 @app.get("/")
 def list_buckets():
     """List buckets — not permitted"""
@@ -145,11 +778,10 @@ def list_buckets():
 @app.head("/{bucket}/")
 async def head_bucket(bucket: str):
     """Check if a bucket exists on any server"""
-    client = app.state.client
 
     async def check_server(server):
         try:
-            result = await client.head(server + bucket + "/", timeout=8)
+            result = await server_request('HEAD', server, bucket + "/", timeout=8)
             return result.status_code
         except httpx.HTTPError:
             return None
@@ -166,13 +798,21 @@ async def head_bucket(bucket: str):
     raise HTTPException(status_code=404)
 
 @app.get("/{bucket}/")
-async def list_bucket(bucket: str):
-    """List all items in a bucket"""
-    client = app.state.client
+async def list_bucket(bucket: str, accept: Annotated[str | None, Header()] = None):
+    """List all items in a bucket
+
+    Accept: application/x-ndjson streams the merged listing in key order,
+    merging each server's key-ordered NDJSON listing as it arrives; memory
+    holds one entry per server rather than the bucket.
+    """
+    if accept and 'application/x-ndjson' in accept:
+        return await stream_bucket(bucket)
+    if LISTING_CACHE_BUCKETS > 0:
+        return await cached_bucket(bucket)
 
     async def fetch_server(server):
         try:
-            result = await client.get(server + bucket + '/', timeout=16)
+            result = await server_request('GET', server, bucket + '/', timeout=16)
         except httpx.HTTPError:
             return server, None
         return server, result
@@ -181,7 +821,7 @@ async def list_bucket(bucket: str):
     # loop below sees results in the same fixed sequence every time.
     results = await asyncio.gather(*[fetch_server(s) for s in object_servers()])
 
-    items = {}
+    replicas = {}
     for server, result in results:
         if result is None or result.status_code not in (200, 404):
             # 503, not 502/504: the locator coordinates object servers but is
@@ -190,14 +830,160 @@ async def list_bucket(bucket: str):
         if result.status_code == 404:
             continue
         for key, value in result.json()['objects'].items():
-            if key not in items:
-                items[key] = value
-                items[key]['locations'] = []
-                items[key]['error'] = False
-            else:
-                for subk in ['size', 'directory', 'checksum']:
-                    if items[key][subk] != value[subk]:
-                        items[key]['error'] = True
-                        items[key][subk] = None
-            items[key]['locations'].append(server)
-    return {'bucket': bucket, 'objects': items}
+            replicas.setdefault(key, []).append((server, value))
+    return {'bucket': bucket,
+            'objects': {key: merge_replicas(found) for key, found in replicas.items()}}
+
+async def cached_bucket(bucket: str):
+    """Serve list_bucket from the listing cache, revalidating it as needed."""
+    listings = app.state.listings
+    listing = listings.get(bucket)
+    if listing is None:
+        listing = listings[bucket] = BucketListing(bucket)
+        while len(listings) > LISTING_CACHE_BUCKETS:
+            listings.popitem(last=False)
+    listings.move_to_end(bucket)
+    age = None if listing.checked is None else time.monotonic() - listing.checked
+    if age is not None and age <= LISTING_FRESH:
+        return Response(content=listing.body(), media_type='application/json')
+    if listing.refresh is None:
+        listing.refresh = asyncio.create_task(revalidate_listing(listing))
+        listing.refresh.add_done_callback(lambda task: task.cancelled() or task.exception())
+    if age is None or age > LISTING_STALE:
+        # Shielded: the revalidation is shared with other requests.
+        await asyncio.shield(listing.refresh)
+    return Response(content=listing.body(), media_type='application/json')
+
+async def revalidate_listing(listing: BucketListing):
+    """Bring every shard of listing up to date with conditional GETs.
+
+    Nothing is applied unless every server answers, so a failure (a 503 to
+    whoever waits on it) leaves the previous, consistent listing in place.
+    """
+    servers = object_servers()
+    bucket = listing.bucket
+
+    async def fetch_server(server):
+        etag = listing.etag(server)
+        headers = {'If-None-Match': etag} if etag else {}
+        try:
+            result = await server_request('GET', server, bucket + '/', timeout=16,
+                                          headers=headers)
+        except httpx.HTTPError:
+            return server, None
+        return server, result
+
+    try:
+        results = await asyncio.gather(*[fetch_server(s) for s in servers])
+        if any(result is None or result.status_code not in (200, 304, 404)
+               for _, result in results):
+            raise HTTPException(503)
+        for server, result in results:
+            if result.status_code == 404:
+                listing.apply(server, None, {}, servers)
+            elif result.status_code == 200:
+                listing.apply(server, result.headers.get('ETag'),
+                              result.json()['objects'], servers)
+        for server in [s for s in listing.shards if s not in servers]:
+            listing.drop(server, servers)
+        listing.checked = time.monotonic()
+    finally:
+        listing.refresh = None
+
+def merge_replicas(replicas) -> dict:
+    """Combine one key's [(server, listing entry)] into a locator entry.
+
+    Fields the replicas disagree on become None and set error.
+    """
+    merged = dict(replicas[0][1])
+    merged['locations'] = []
+    merged['error'] = False
+    for server, value in replicas:
+        for subk in ['size', 'directory', 'checksum']:
+            if merged[subk] != value[subk]:
+                merged['error'] = True
+                merged[subk] = None
+        merged['locations'].append(server)
+    return merged
+
+async def open_listing(server: str, bucket: str):
+    """Start a server's key-ordered NDJSON listing, or None without the bucket.
+
+    The response body is left unread (see iter_listing). Raises
+    httpx.HTTPError if the server cannot answer.
+    """
+    result = await server_request('GET', server, bucket + '/', timeout=16, stream=True,
+                                  params={'order': 'key'},
+                                  headers={'Accept': 'application/x-ndjson'})
+    if result.status_code != 200:
+        await result.aclose()
+        if result.status_code == 404:
+            return None
+        result.raise_for_status()
+    return result
+
+async def iter_listing(server: str, response: httpx.Response):
+    """Yield (key, entry) from a server's listing response, in key order."""
+    previous = None
+    async for line in response.aiter_lines():
+        if not line:
+            continue
+        entry = json.loads(line)
+        key = entry.pop('key')
+        if previous is not None and key <= previous:
+            # An object server that ignores order=key; merging it would
+            # report keys as missing from it.
+            raise ValueError(f"{server} listing is not in key order")
+        previous = key
+        yield key, entry
+
+async def merge_listings(listings):
+    """k-way merge of [(server, key-ordered listing)] into (key, merged entry)."""
+    heap = []
+
+    async def advance(index):
+        try:
+            key, value = await anext(listings[index][1])
+        except StopAsyncIteration:
+            return
+        heapq.heappush(heap, (key, index, value))
+
+    await asyncio.gather(*[advance(i) for i in range(len(listings))])
+    while heap:
+        key, index, value = heapq.heappop(heap)
+        found = [(index, value)]
+        while heap and heap[0][0] == key:
+            _, other, other_value = heapq.heappop(heap)
+            found.append((other, other_value))
+        await asyncio.gather(*[advance(i) for i, _ in found])
+        yield key, merge_replicas([(listings[i][0], v) for i, v in sorted(found)])
+
+async def stream_bucket(bucket: str):
+    """NDJSON response merging every server's key-ordered listing by key.
+
+    Every server's listing is started before responding, so an unreachable
+    server is still a 503; a failure after that cuts the stream short.
+    """
+    servers = object_servers()
+    results = await asyncio.gather(*[open_listing(s, bucket) for s in servers],
+                                   return_exceptions=True)
+    responses = [(server, result) for server, result in zip(servers, results)
+                 if isinstance(result, httpx.Response)]
+    failed = [result for result in results if isinstance(result, BaseException)]
+    if failed:
+        for _, response in responses:
+            await response.aclose()
+        if all(isinstance(e, httpx.HTTPError) for e in failed):
+            raise HTTPException(503)
+        raise failed[0]
+    listings = [(server, iter_listing(server, response)) for server, response in responses]
+
+    async def lines():
+        try:
+            async for key, merged in merge_listings(listings):
+                yield json.dumps({'key': key, **merged}) + '\n'
+        finally:
+            for _, response in responses:
+                await response.aclose()
+
+    return StreamingResponse(lines(), media_type='application/x-ndjson')
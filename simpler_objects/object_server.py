@@ -1,26 +1,65 @@
 """Simpler Objects Server"""
 
 import asyncio
+import collections
 import errno
 import pathlib
 import shutil
 import base64
 import hashlib
 import fcntl
+import heapq
+import json
 import os
+import stat
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Annotated
-from fastapi import FastAPI, HTTPException, Header, Request
-from fastapi.responses import FileResponse, Response
+import httpx
+from fastapi import FastAPI, HTTPException, Header, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.datastructures import MutableHeaders
 from simpler_objects.common import check_content_type_extension
 
-from simpler_objects.common import ChecksumFile
+from simpler_objects.common import (ChecksumFile, checksum_file_id, checksum_index,
+                                    read_checksum_tail)
 
 app = FastAPI()
 
 OBJECT_DIRECTORY = os.environ.get('OBJECT_DIRECTORY', '.')
 READ_ONLY = bool(os.environ.get('READ_ONLY', ''))
+# Re-read each committed object from disk and compare against the digest
+# computed while streaming. Costs a second full read per PUT.
+VERIFY_FROM_DISK = bool(os.environ.get('VERIFY_FROM_DISK', ''))
+# Reserve Content-Length bytes before reading a PUT body. Set empty to disable
+# on filesystems without native fallocate, where glibc emulates it by writing
+# zeros.
+PREALLOCATE = bool(os.environ.get('PREALLOCATE', '1'))
+# Set to a window in seconds (e.g. 0.002; 0 for no added wait) to batch the
+# <bucket>.sha256 appends of concurrent PUTs into one write and one fsync.
+# Unset: one write and fsync per PUT.
+GROUP_COMMIT = float(os.environ['GROUP_COMMIT']) if os.environ.get('GROUP_COMMIT') else None
 BUFFER = 67108864
+# Received PUT chunks allowed to wait for the disk writer before the receive
+# loop stops reading from the socket.
+WRITE_BEHIND_CHUNKS = 16
+# GETs of at least this many bytes drop their pages from the cache once sent,
+# so one large read does not evict everyone else's hot objects.
+DROP_CACHE_BYTES = BUFFER
 RETRY_AFTER = "64"
+# A bucket directory modified less than this many seconds ago gets no listing
+# ETag: on filesystems with coarse timestamps (FAT, 2 s) a further change could
+# leave the mtime as it was.
+ETAG_SETTLE = 2.0
+# Most keys accepted by one POST /{bucket}/_stat.
+STAT_LIMIT = 10000
+# Space-separated base URLs a PUT with Copy-Source may pull from (the other
+# object servers); matched on scheme, host and port. Unset: Copy-Source is
+# refused, so the server cannot be made to fetch arbitrary URLs.
+COPY_PEERS = tuple(os.environ.get('COPY_PEERS', '').split())
+COPY_TIMEOUT = 2048
 
 
 def safe_path(*parts) -> pathlib.Path:
@@ -73,6 +112,199 @@ def file_checksum(path):
             hash_sha256.update(chunk)
     return hash_sha256.digest()
 
+_disk_writers = {}
+
+def disk_writer(path: pathlib.Path) -> ThreadPoolExecutor:
+    """Return the single writer thread for the filesystem holding path.
+
+    Only the event loop thread calls this, so the dict needs no lock.
+    """
+    dev = os.stat(path.parent).st_dev
+    executor = _disk_writers.get(dev)
+    if executor is None:
+        executor = _disk_writers[dev] = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"disk-writer-{dev}")
+    return executor
+
+def preallocate(fd, length):
+    """Reserve length bytes for fd; a full disk raises ENOSPC here.
+
+    Filesystems that cannot preallocate at all are left to allocate as they
+    write.
+    """
+    try:
+        os.posix_fallocate(fd, 0, length)
+    except OSError as e:
+        if e.errno not in (errno.EINVAL, errno.EOPNOTSUPP):
+            raise
+
+def _write_chunk(fd, chunk, hash_sha256):
+    """Write all of chunk to fd and fold it into the running digest."""
+    view = memoryview(chunk)
+    while view:
+        view = view[os.write(fd, view):]
+    hash_sha256.update(chunk)
+
+class WriteBehind:
+    """Bounded write-behind queue for one upload.
+
+    Chunks are written (and hashed) in order on the disk's writer thread. Once
+    WRITE_BEHIND_CHUNKS are outstanding, write() waits for the oldest, which
+    stops the receive loop and so applies backpressure to the client.
+    """
+
+    def __init__(self, fd, executor):
+        self.fd = fd
+        self.executor = executor
+        self.hash_sha256 = hashlib.sha256()
+        self.pending = collections.deque()
+        self.size = 0
+
+    async def write(self, chunk):
+        self.size += len(chunk)
+        self.pending.append(asyncio.wrap_future(
+            self.executor.submit(_write_chunk, self.fd, chunk, self.hash_sha256)))
+        if len(self.pending) >= WRITE_BEHIND_CHUNKS:
+            # Only dequeue once done: close() relies on pending to know
+            # whether the writer thread may still be using fd.
+            await self.pending[0]
+            self.pending.popleft()
+
+    async def flush(self):
+        """Wait until every queued chunk is on disk (not yet fsynced)."""
+        while self.pending:
+            await self.pending[0]
+            self.pending.popleft()
+
+    def close(self):
+        """Close fd once no queued write can still touch it.
+
+        After a failed upload, writes may still be queued; cancel what has not
+        started and let the writer thread close fd behind the rest, so the
+        descriptor is never closed (and possibly reused) under a write.
+        """
+        if not self.pending:
+            os.close(self.fd)
+            return
+        for fut in self.pending:
+            fut.cancel()
+        self.executor.submit(os.close, self.fd)
+
+class ChecksumGroupCommit:
+    """Batch concurrent checksum appends for one bucket.
+
+    Appenders queue their line and wait on a future. A single flusher task
+    waits out the GROUP_COMMIT window, then writes every queued line with one
+    O_APPEND write and one fsync on a worker thread. Lines queued while that
+    fsync runs go out in the next batch. Each appender's future resolves only
+    once its line is durable; a failed write or fsync fails the whole batch.
+    """
+
+    def __init__(self, cksum: ChecksumFile):
+        self.cksum = cksum
+        self.queue = []
+        self.flusher = None
+
+    def append(self, key: str, digest: bytes) -> asyncio.Future:
+        """Queue a line; the returned future resolves once it is durable."""
+        fut = asyncio.get_running_loop().create_future()
+        self.queue.append((key, digest, fut))
+        if self.flusher is None:
+            self.flusher = asyncio.create_task(self._flush())
+        return fut
+
+    async def _flush(self):
+        try:
+            while self.queue:
+                if GROUP_COMMIT:
+                    await asyncio.sleep(GROUP_COMMIT)
+                batch, self.queue = self.queue, []
+                try:
+                    await asyncio.to_thread(self.cksum.append_many,
+                                            [(key, digest) for key, digest, _ in batch])
+                except Exception as e:
+                    for _, _, fut in batch:
+                        if not fut.done():
+                            fut.set_exception(e)
+                else:
+                    for _, _, fut in batch:
+                        if not fut.done():
+                            fut.set_result(None)
+        finally:
+            self.flusher = None
+
+_group_commits = {}
+
+def checksum_group_commit(bucket_dir: pathlib.Path) -> ChecksumGroupCommit:
+    """Return the group committer for a bucket's checksum file."""
+    cksum = ChecksumFile(bucket_dir)
+    committer = _group_commits.get(cksum.path)
+    if committer is None:
+        committer = _group_commits[cksum.path] = ChecksumGroupCommit(cksum)
+    return committer
+
+class ObjectFileResponse(FileResponse):
+    """FileResponse that streams object bodies with zero-copy and cache hints.
+
+    Whole-object and single-range bodies are sent with the ASGI
+    ``http.response.zerocopysend`` extension (os.sendfile in the server) when
+    the server offers it, else read in chunks through our own descriptor. The
+    range is marked POSIX_FADV_SEQUENTIAL for aggressive readahead and, when
+    large, POSIX_FADV_DONTNEED once sent. Range parsing, HEAD, pathsend and
+    multi-range responses are left to Starlette.
+    """
+
+    chunk_size = 1024 * 1024
+
+    async def __call__(self, scope, receive, send):
+        self.zerocopy = "http.response.zerocopysend" in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    async def _handle_simple(self, send, send_header_only, send_pathsend=False):
+        if send_header_only or send_pathsend:
+            await super()._handle_simple(send, send_header_only, send_pathsend)
+            return
+        await send({"type": "http.response.start", "status": self.status_code,
+                    "headers": self.raw_headers})
+        await self._send_range(send, 0, int(self.headers["content-length"]))
+
+    async def _handle_single_range(self, send, start, end, file_size, send_header_only):
+        if send_header_only:
+            await super()._handle_single_range(send, start, end, file_size, send_header_only)
+            return
+        headers = MutableHeaders(raw=list(self.raw_headers))
+        headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        headers["content-length"] = str(end - start)
+        await send({"type": "http.response.start", "status": 206, "headers": headers.raw})
+        await self._send_range(send, start, end)
+
+    async def _send_range(self, send, start, end):
+        """Send bytes [start, end) of the file as the response body."""
+        file = await asyncio.to_thread(open, self.path, "rb", 0)
+        fd = file.fileno()
+        try:
+            os.posix_fadvise(fd, start, end - start, os.POSIX_FADV_SEQUENTIAL)
+            if self.zerocopy:
+                await send({"type": "http.response.zerocopysend", "file": file,
+                            "offset": start, "count": end - start, "more_body": False})
+                return
+            if start >= end:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+            offset = start
+            while offset < end:
+                chunk = await asyncio.to_thread(
+                    os.pread, fd, min(self.chunk_size, end - offset), offset)
+                if not chunk:
+                    raise RuntimeError(f"File at path {self.path} is shorter than expected.")
+                offset += len(chunk)
+                await send({"type": "http.response.body", "body": chunk,
+                            "more_body": offset < end})
+        finally:
+            if end - start >= DROP_CACHE_BYTES:
+                os.posix_fadvise(fd, start, end - start, os.POSIX_FADV_DONTNEED)
+            file.close()
+
 
 @app.get('/health')
 def healthcheck():
@@ -94,7 +326,8 @@ def get_object(bucket: str, key: str):
 
     A sync route: every operation here is a blocking syscall with nothing to
     await, so FastAPI runs it in the worker threadpool and the event loop is
-    never stalled. The returned FileResponse is still streamed asynchronously.
+    never stalled. The returned ObjectFileResponse is still streamed
+    asynchronously.
     """
     path = object_filename(bucket, key)
     try:
@@ -113,17 +346,25 @@ def get_object(bucket: str, key: str):
         # open above and acquiring the lock.
         if not path.is_file():
             raise HTTPException(status_code=404)
-        my_cksum = ChecksumFile(path.parent).lookup(key)
+        my_cksum = checksum_index(path.parent).lookup(key)
     finally:
         os.close(fd)
     headers = None
     if my_cksum:
         headers = {"Repr-Digest": http_digest_head(my_cksum)}
-    return FileResponse(path, headers=headers)
+    return ObjectFileResponse(path, headers=headers)
 
 @app.put("/{bucket}/{key}")
 async def put_object(bucket: str, key: str, request: Request,
-                     content_length: Annotated[int | None, Header()] = None):
+                     content_length: Annotated[int | None, Header()] = None,
+                     copy_source: Annotated[str | None, Header()] = None):
+    """Store an object from the request body, or pulled from a peer.
+
+    With a Copy-Source header (the URL of the object on another object
+    server) the request body is ignored: this server GETs the object itself,
+    so a replicator only has to send control requests. The pulled body must
+    match Repr-Digest/Content-Digest, the source's Repr-Digest, or both.
+    """
     if READ_ONLY:
         raise HTTPException(status_code=405)
 
@@ -131,7 +372,51 @@ async def put_object(bucket: str, key: str, request: Request,
         raise HTTPException(status_code=415)
 
     path = object_filename(bucket, key)
+    request_digest = parse_digest_headers(request.headers)
+    if copy_source is None:
+        return await store_object(path, request.stream(), content_length, request_digest)
+
+    if not is_copy_peer(copy_source):
+        raise HTTPException(status_code=403)
+    if path.exists():
+        raise HTTPException(status_code=409)
+    try:
+        async with httpx.AsyncClient(timeout=COPY_TIMEOUT) as client:
+            async with client.stream('GET', copy_source) as source:
+                if source.status_code == 503:
+                    raise HTTPException(status_code=503, headers={
+                        "Retry-After": source.headers.get('retry-after', RETRY_AFTER)})
+                if source.status_code != 200 or 'content-length' not in source.headers:
+                    raise HTTPException(status_code=502)
+                source_digest = parse_digest_header(source.headers.get('repr-digest'))
+                if request_digest and source_digest and request_digest != source_digest:
+                    raise HTTPException(status_code=409)
+                if not (request_digest or source_digest):
+                    raise HTTPException(status_code=502)
+                return await store_object(path, source.aiter_bytes(),
+                                          int(source.headers['content-length']),
+                                          request_digest or source_digest)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502) from None
+
+def url_origin(url: str) -> tuple:
+    """(scheme, host, port) that url connects to, default ports filled in."""
+    parsed = httpx.URL(url)
+    return (parsed.scheme, parsed.host,
+            parsed.port or {'http': 80, 'https': 443}.get(parsed.scheme))
+
+def is_copy_peer(url: str) -> bool:
+    """Whether Copy-Source url points at one of COPY_PEERS."""
+    try:
+        origin = url_origin(url)
+        peers = {url_origin(peer) for peer in COPY_PEERS}
+    except httpx.InvalidURL:
+        return False
+    return origin[0] in ('http', 'https') and origin in peers
 
+async def store_object(path: pathlib.Path, chunks, content_length: int | None,
+                       request_digest: bytes | None):
+    """Create path from chunks and commit it through the checksum file; 201 or raise."""
     # O_EXCL creates the object atomically: an existing key — or a racing
     # same-key PUT that won the create — lands here as 409.
     try:
@@ -141,24 +426,45 @@ async def put_object(bucket: str, key: str, request: Request,
     except (FileNotFoundError, NotADirectoryError):
         raise HTTPException(status_code=404) from None
 
+    writer = WriteBehind(fd, disk_writer(path))
+    appending = False
     try:
         # Hold an exclusive lock for the whole upload so a concurrent GET
         # fails fast with 503 rather than reading a partial file.
         fcntl.flock(fd, fcntl.LOCK_EX)
         try:
-            request_digest = parse_digest_headers(request.headers)
-            with os.fdopen(fd, "wb", closefd=False) as dst:
-                async for chunk in request.stream():
-                    dst.write(chunk)
-            # Offload the blocking commit steps (fsync, whole-file hash) so a
+            # Claim the space before the first receive: uvicorn only sends
+            # 100 Continue once the body is read, so a full disk is refused
+            # with 507 before the client streams anything. Large objects also
+            # get contiguous extents this way.
+            if PREALLOCATE and content_length:
+                await asyncio.to_thread(preallocate, fd, content_length)
+            # Blocking writes happen on the disk's writer thread, which also
+            # hashes the body as it goes so the commit needs no second read of
+            # the whole object.
+            async for chunk in chunks:
+                await writer.write(chunk)
+            await writer.flush()
+            # Offload the blocking commit steps (fsync, optional re-read) so a
             # large upload does not stall the event loop for other requests.
             await asyncio.to_thread(os.fsync, fd)
-            if content_length is not None and os.fstat(fd).st_size != content_length:
+            # Count received bytes: preallocation already sized the file.
+            if content_length is not None and writer.size != content_length:
                 raise HTTPException(status_code=400)
-            file_digest = await asyncio.to_thread(file_checksum, path)
+            file_digest = writer.hash_sha256.digest()
+            if VERIFY_FROM_DISK and await asyncio.to_thread(file_checksum, path) != file_digest:
+                raise HTTPException(status_code=500)
             if request_digest and file_digest != request_digest:
                 raise HTTPException(status_code=400)
-            ChecksumFile(path.parent).append(path.name, file_digest)
+            # From here the line may reach the checksum file even if this
+            # request is cancelled, so cancellation must keep the object.
+            appending = True
+            if GROUP_COMMIT is None:
+                await asyncio.to_thread(ChecksumFile(path.parent).append,
+                                        path.name, file_digest)
+            else:
+                await asyncio.shield(
+                    checksum_group_commit(path.parent).append(path.name, file_digest))
             return Response(status_code=201, content=None,
                             headers={"Repr-Digest": http_digest_head(file_digest)})
         except OSError as e:
@@ -169,10 +475,11 @@ async def put_object(bucket: str, key: str, request: Request,
         except BaseException:
             # Any non-crash failure (client disconnect, cancellation, bad
             # length/digest) must leave no partial object behind.
-            path.unlink(missing_ok=True)
+            if not appending:
+                path.unlink(missing_ok=True)
             raise
     finally:
-        os.close(fd)
+        writer.close()
 
 @app.get("/")
 def list_buckets():
@@ -187,27 +494,222 @@ def head_bucket(bucket: str):
     return Response(status_code=200)
 
 
+def scan_entries(dir_path: pathlib.Path, prefix: str = '', start_after: str | None = None):
+    """Yield os.DirEntry for each bucket entry matching prefix and after start_after."""
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            if not entry.name.startswith(prefix):
+                continue
+            if start_after is not None and entry.name <= start_after:
+                continue
+            yield entry
+
+def sorted_entries(dir_path: pathlib.Path, prefix: str = '', start_after: str | None = None):
+    """Yield a pathlib.Path per scan_entries entry, in key order.
+
+    One directory scan per listing; only the names are held while sorting.
+    """
+    names = sorted(entry.name for entry in scan_entries(dir_path, prefix, start_after))
+    for name in names:
+        yield dir_path / name
+
+def entry_info(entry: os.DirEntry | pathlib.Path, index) -> dict | None:
+    """Listing record for one entry, or None if it vanished mid-listing.
+
+    For an os.DirEntry, is_dir() reuses the dirent type, so only regular
+    files cost a stat().
+    """
+    if entry.is_dir():
+        return {'directory': True, 'size': None, 'checksum': None}
+    try:
+        size = entry.stat().st_size
+    except FileNotFoundError:
+        return None
+    digest = index.get(entry.name)
+    return {'directory': False,
+            'size': size,
+            'checksum': digest.hex() if digest else None}
+
+def listing_etag(dir_path: pathlib.Path, *variant) -> str | None:
+    """ETag of a bucket listing, from two stats instead of a directory walk.
+
+    Adding or removing an object changes the directory mtime, and committing
+    one appends to <bucket>.sha256 (a rewrite replaces its inode). variant
+    (query and media type) keeps different listings of one bucket apart.
+    None while the directory mtime is too recent to trust.
+    """
+    st = os.stat(dir_path)
+    if time.time() - st.st_mtime < ETAG_SETTLE:
+        return None
+    try:
+        cksum = os.stat(ChecksumFile(dir_path).path)
+        cksum_id = f"{cksum.st_ino:x}.{cksum.st_size:x}"
+    except FileNotFoundError:
+        cksum_id = "0.0"
+    query = zlib.crc32(repr(variant).encode())
+    return f'"{st.st_ino:x}.{st.st_mtime_ns:x}.{cksum_id}.{query:x}"'
+
+def etag_matches(if_none_match: str | None, etag: str | None) -> bool:
+    """Weak comparison of an If-None-Match header against etag (RFC 9110)."""
+    if not if_none_match or not etag:
+        return False
+    tags = [t.strip().removeprefix('W/') for t in if_none_match.split(',')]
+    return '*' in tags or etag in tags
+
+def _ndjson_lines(entries, index):
+    for entry in entries:
+        info = entry_info(entry, index)
+        if info is not None:
+            yield json.dumps({'key': entry.name, **info}) + '\n'
+
+def bucket_changes(bucket: str, dir_path: pathlib.Path, since: int,
+                   file_id: str | None, limit: int | None) -> dict:
+    """Checksum-log records committed at or after byte offset since.
+
+    The <bucket>.sha256 file is append-only while the server runs, so a
+    (file-id, offset) pair from a previous call resumes exactly where it left
+    off. If the file has since been replaced (file-id differs) or is shorter
+    than since, the feed restarts from offset 0 and says so with reset.
+    """
+    cksum = ChecksumFile(dir_path)
+    try:
+        fp = open(cksum.path, 'rb')
+    except FileNotFoundError:
+        return {'bucket': bucket, 'file-id': None, 'offset': 0,
+                'reset': since != 0, 'changes': []}
+    with fp:
+        st = os.fstat(fp.fileno())
+        current_id = checksum_file_id(st)
+        reset = (file_id is not None and file_id != current_id) or since > st.st_size
+        if reset:
+            since = 0
+        entries, offset = read_checksum_tail(fp, since, st.st_size, limit)
+    changes = []
+    for digest, filename in entries:
+        try:
+            size = (dir_path / filename).stat().st_size
+        except FileNotFoundError:
+            size = None
+        changes.append({'key': filename, 'checksum': digest, 'size': size})
+    return {'bucket': bucket, 'file-id': current_id, 'offset': offset,
+            'reset': reset, 'changes': changes}
+
 @app.get("/{bucket}/")
-def list_directory(bucket: str):
-    """List objects in bucket"""
+def list_directory(bucket: str,
+                   response: Response,
+                   prefix: str = '',
+                   start_after: Annotated[str | None, Query(alias='start-after')] = None,
+                   limit: Annotated[int | None, Query(ge=1)] = None,
+                   order: Annotated[str | None, Query(pattern='^key$')] = None,
+                   changes_since: Annotated[int | None, Query(alias='changes-since', ge=0)] = None,
+                   file_id: Annotated[str | None, Query(alias='file-id')] = None,
+                   accept: Annotated[str | None, Header()] = None,
+                   if_none_match: Annotated[str | None, Header()] = None):
+    """List objects in bucket
+
+    With limit, returns the limit smallest keys after start-after, in key
+    order; memory is bounded by limit rather than by the bucket. Without it,
+    every matching entry is returned in directory order, or in key order with
+    order=key (one scan, holding only the names). Accept:
+    application/x-ndjson streams one JSON object per line as the directory is
+    read, so time-to-first-byte does not grow with the bucket.
+
+    With changes-since, returns the change feed instead (see bucket_changes);
+    limit then caps the number of records.
+
+    Listings carry an ETag (see listing_etag); a matching If-None-Match gets
+    a 304 without reading the directory or the checksum file.
+    """
     dir_path = safe_path(bucket)
     if not dir_path.is_dir():
         raise HTTPException(status_code=404)
+    if changes_since is not None:
+        return bucket_changes(bucket, dir_path, changes_since, file_id, limit)
+    ndjson = bool(accept and 'application/x-ndjson' in accept)
+    etag = listing_etag(dir_path, prefix, start_after, limit, order, ndjson)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    headers = {'ETag': etag} if etag else {}
+    index = checksum_index(dir_path)
+    index.refresh()
+    entries = scan_entries(dir_path, prefix, start_after)
+    truncated = False
+    if limit is not None:
+        entries = heapq.nsmallest(limit + 1, entries, key=lambda e: e.name)
+        truncated = len(entries) > limit
+        entries = entries[:limit]
+    elif order == 'key':
+        entries = sorted_entries(dir_path, prefix, start_after)
+    if ndjson:
+        return StreamingResponse(_ndjson_lines(entries, index), headers=headers,
+                                 media_type='application/x-ndjson')
+    response.headers.update(headers)
     r = {"bucket": bucket,
          "objects": {}}
-    hashes = ChecksumFile(dir_path).as_dict()
-    for name in dir_path.iterdir():
-        if name.is_dir():
-            r['objects'][name.name] = {'directory': True,
-                                        'size': None,
-                                        'checksum': None}
-        else:
-            r['objects'][name.name] = {'directory': False,
-                                        'size': name.stat().st_size,
-                                        'checksum': hashes.get(name.name)}
+    for entry in entries:
+        info = entry_info(entry, index)
+        if info is not None:
+            r['objects'][entry.name] = info
+    if limit is not None:
+        r['truncated'] = truncated
     return r
 
 
+class StatRequest(BaseModel):
+    keys: list[str] = Field(max_length=STAT_LIMIT)
+
+def is_busy(path: pathlib.Path) -> bool:
+    """True if a PUT holds the object's exclusive lock."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+    return False
+
+def stat_key(dir_path: pathlib.Path, key: str, index) -> dict | None:
+    """_stat record for one key, or None if no object by that name is here.
+
+    A key with a checksum line is committed, so only keys without one (a PUT
+    in progress, or an object from before checksums) are opened to test the
+    lock.
+    """
+    if '/' in key or key in ('', '.', '..'):
+        return None
+    path = dir_path / key
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        # Missing, or a name no file could have (too long, NUL byte).
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    digest = index.get(key)
+    return {'size': st.st_size,
+            'checksum': digest.hex() if digest else None,
+            'busy': digest is None and is_busy(path)}
+
+@app.post("/{bucket}/_stat")
+def stat_objects(bucket: str, request: StatRequest):
+    """Size, checksum and busy state of many keys at once
+
+    One stat per key and one checksum-index refresh for the whole request,
+    in place of a HEAD (open, flock, checksum lookup) per key.
+    """
+    dir_path = safe_path(bucket)
+    if not dir_path.is_dir():
+        raise HTTPException(status_code=404)
+    index = checksum_index(dir_path)
+    index.refresh()
+    return {'bucket': bucket,
+            'objects': {key: stat_key(dir_path, key, index) for key in request.keys}}
+
+
 #def run(server_class=DirHTTPServer, handler_class=PutHTTPRequestHandler,
 #        port=46579, directory=None):
 #    """Run this server"""
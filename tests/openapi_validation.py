@@ -11,6 +11,7 @@ the *shape* of the spec (which paths/methods exist); this checks that actual
 responses *conform* to it.
 """
 
+import json
 import pathlib
 import re
 
@@ -35,7 +36,8 @@ def _match_path(concrete_path):
     paths = _SPEC["paths"]
     if concrete_path in paths:
         return concrete_path
-    for template in paths:
+    # Most literal segments first, so /{bucket}/_locate beats /{bucket}/{key}.
+    for template in sorted(paths, key=lambda t: t.count("{")):
         if "{" not in template:
             continue
         regex = "/".join(
@@ -52,14 +54,18 @@ def _json_pointer(*segments):
     return "/" + "/".join(s.replace("~", "~0").replace("/", "~1") for s in segments)
 
 
-def _schema_ref(template, method, status):
+def _schema_ref(template, method, status, content_type=None):
     """Absolute $ref to the JSON schema documented for a response, or None.
 
-    Matches any json-ish media type, so application/problem+json error bodies
+    Prefers the media type matching the response's Content-Type; otherwise
+    matches any json-ish media type, so application/problem+json error bodies
     are validated the same as application/json.
     """
     response_def = _SPEC["paths"][template][method]["responses"][status]
-    for media_type, media in response_def.get("content", {}).items():
+    content = response_def.get("content", {})
+    if content_type in content:
+        content = {content_type: content[content_type]}
+    for media_type, media in content.items():
         if "json" in media_type and "schema" in media:
             pointer = _json_pointer(
                 "paths", template, method, "responses", status,
@@ -86,10 +92,17 @@ def validate_response(response):
         f"(openapi.yaml documents {sorted(documented)})"
     )
 
-    ref = _schema_ref(template, method, status)
+    content_type = response.headers.get("content-type", "").split(";")[0].strip()
+    ref = _schema_ref(template, method, status, content_type)
     if ref is None or method == "head" or not response.content:
         return
-    Draft202012Validator({"$ref": ref}, registry=_REGISTRY).validate(response.json())
+    validator = Draft202012Validator({"$ref": ref}, registry=_REGISTRY)
+    if content_type == "application/x-ndjson":
+        # Newline-delimited JSON: the schema describes each line.
+        for line in response.text.splitlines():
+            validator.validate(json.loads(line))
+        return
+    validator.validate(response.json())
 
 
 class ValidatingTestClient(TestClient):
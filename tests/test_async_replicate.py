@@ -5,21 +5,30 @@ when piping a streaming GET body into a PUT. The test verifies the outgoing
 PUT request carries the correct Content-Length header.
 """
 
+import asyncio
 import base64
 import hashlib
+import json
+import os
+import signal
 import sys
+import time
 from unittest.mock import patch
 
 import httpx
 import pytest
 import respx
 
+from simpler_objects import async_replicate
 from simpler_objects.async_replicate import (
+    Throttle,
+    TokenBucket,
     auto_replica,
     cli,
     find_space,
     get_bucket_contents,
     get_object_size,
+    reload_limits,
     replicate_object,
 )
 
@@ -35,6 +44,14 @@ CONTENT = b"Hello, replicated world!"
 CKSUM = "sha-256=:" + base64.b64encode(hashlib.sha256(CONTENT).digest()).decode() + ":"
 
 
+def _run(func, *args, **kwargs):
+    """Call an async replication helper with a fresh pooled client."""
+    async def main():
+        async with httpx.AsyncClient() as client:
+            return await func(client, *args, **kwargs)
+    return asyncio.run(main())
+
+
 def _health(write=True, available=10 ** 9, percent=50):
     return {
         "write": write,
@@ -55,7 +72,7 @@ def test_find_space_returns_candidate():
     respx.get(LOCATOR + "health").mock(return_value=httpx.Response(200, json=health))
     respx.head(SERVER_A + BUCKET + "/").mock(return_value=httpx.Response(200))
     respx.head(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(200))
-    result = find_space(LOCATOR, BUCKET, 1024, current=[SERVER_A], desired=1)
+    result = _run(find_space, LOCATOR, BUCKET, 1024, current=[SERVER_A], desired=1)
     assert len(result) == 1
     assert result[0] == SERVER_B
 
@@ -65,7 +82,7 @@ def test_find_space_excludes_current():
     health = {"servers": {SERVER_A: _health(), SERVER_B: _health()}}
     respx.get(LOCATOR + "health").mock(return_value=httpx.Response(200, json=health))
     respx.head(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(200))
-    result = find_space(LOCATOR, BUCKET, 1024, current=[SERVER_A], desired=1)
+    result = _run(find_space, LOCATOR, BUCKET, 1024, current=[SERVER_A], desired=1)
     assert SERVER_A not in result
 
 
@@ -74,7 +91,7 @@ def test_find_space_no_writable_servers():
     no_space = _health(write=False, available=0, percent=0)
     health = {"servers": {SERVER_A: no_space, SERVER_B: no_space}}
     respx.get(LOCATOR + "health").mock(return_value=httpx.Response(200, json=health))
-    result = find_space(LOCATOR, BUCKET, 1024, current=[], desired=2)
+    result = _run(find_space, LOCATOR, BUCKET, 1024, current=[], desired=2)
     assert result == []
 
 
@@ -85,7 +102,7 @@ def test_find_space_bucket_missing_excluded():
     respx.get(LOCATOR + "health").mock(return_value=httpx.Response(200, json=health))
     respx.head(SERVER_A + BUCKET + "/").mock(return_value=httpx.Response(404))
     respx.head(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(200))
-    result = find_space(LOCATOR, BUCKET, 1024, current=[], desired=2)
+    result = _run(find_space, LOCATOR, BUCKET, 1024, current=[], desired=2)
     assert SERVER_A not in result
     assert SERVER_B in result
 
@@ -100,7 +117,7 @@ def test_get_object_size_success():
         200,
         headers={"Content-Length": str(len(CONTENT)), "Repr-Digest": CKSUM},
     ))
-    size, cksum = get_object_size(SRC)
+    size, cksum = _run(get_object_size, SRC)
     assert size == len(CONTENT)
     assert cksum == CKSUM
 
@@ -108,7 +125,7 @@ def test_get_object_size_success():
 @respx.mock
 def test_get_object_size_404_skip():
     respx.head(DST).mock(return_value=httpx.Response(404))
-    size, cksum = get_object_size(DST, skip_404=True)
+    size, cksum = _run(get_object_size, DST, skip_404=True)
     assert size == 0
     assert cksum is None
 
@@ -119,7 +136,7 @@ def test_get_object_size_no_digest():
         200,
         headers={"Content-Length": str(len(CONTENT))},
     ))
-    size, cksum = get_object_size(SRC)
+    size, cksum = _run(get_object_size, SRC)
     assert size == len(CONTENT)
     assert cksum is None
 
@@ -138,7 +155,7 @@ def test_get_bucket_contents():
         }
     }
     respx.get(bucket_url).mock(return_value=httpx.Response(200, json=payload))
-    result = get_bucket_contents(bucket_url)
+    result = _run(get_bucket_contents, bucket_url)
     assert "file.txt" in result
     assert "subdir/" not in result  # directories are excluded
     assert result["file.txt"] == (42, "sha256:abc")
@@ -178,7 +195,7 @@ def test_replicate_object_content_length_header():
     ))
     put_route = respx.put(DST).mock(return_value=httpx.Response(201))
 
-    result = replicate_object(SRC, DST)
+    result = _run(replicate_object, SRC, DST)
 
     assert result == len(CONTENT)
     assert put_route.called
@@ -205,7 +222,53 @@ def test_replicate_object_returns_size():
     ))
     respx.put(DST).mock(return_value=httpx.Response(201))
 
-    assert replicate_object(SRC, DST) == len(CONTENT)
+    assert _run(replicate_object, SRC, DST) == len(CONTENT)
+
+
+@respx.mock
+def test_replicate_object_pull_sends_only_control_requests(monkeypatch):
+    """With PULL the destination fetches the body; nothing is relayed here."""
+    monkeypatch.setattr("simpler_objects.async_replicate.PULL", True)
+    respx.head(SRC).mock(return_value=httpx.Response(
+        200, headers={"Content-Length": str(len(CONTENT)), "Repr-Digest": CKSUM},
+    ))
+    respx.head(DST).mock(side_effect=_dst_head_sequence(
+        httpx.Response(404),
+        httpx.Response(200, headers={"Content-Length": str(len(CONTENT)), "Repr-Digest": CKSUM}),
+    ))
+    get_route = respx.get(SRC).mock(return_value=httpx.Response(200, content=CONTENT))
+    put_route = respx.put(DST).mock(return_value=httpx.Response(201))
+
+    assert _run(replicate_object, SRC, DST) == len(CONTENT)
+    assert not get_route.called
+    request = put_route.calls.last.request
+    assert request.headers["Copy-Source"] == SRC
+    assert request.headers["Repr-Digest"] == CKSUM
+    assert request.content == b""
+
+
+@respx.mock
+def test_replicate_object_pull_relays_when_bytes_limited(monkeypatch):
+    """A pulled copy can't be paced from here, so byte limits fall back to relaying."""
+    monkeypatch.setattr("simpler_objects.async_replicate.PULL", True)
+    monkeypatch.setattr(async_replicate, "THROTTLE",
+                        Throttle({"REPLICATION_SERVER_BYTES_PER_SEC": "1000000"}))
+    respx.head(SRC).mock(return_value=httpx.Response(
+        200, headers={"Content-Length": str(len(CONTENT)), "Repr-Digest": CKSUM},
+    ))
+    respx.head(DST).mock(side_effect=_dst_head_sequence(
+        httpx.Response(404),
+        httpx.Response(200, headers={"Content-Length": str(len(CONTENT)), "Repr-Digest": CKSUM}),
+    ))
+    get_route = respx.get(SRC).mock(return_value=httpx.Response(
+        200, content=CONTENT,
+        headers={"Content-Length": str(len(CONTENT)), "Repr-Digest": CKSUM},
+    ))
+    put_route = respx.put(DST).mock(return_value=httpx.Response(201))
+
+    assert _run(replicate_object, SRC, DST) == len(CONTENT)
+    assert get_route.called
+    assert "Copy-Source" not in put_route.calls.last.request.headers
 
 
 @respx.mock
@@ -222,7 +285,7 @@ def test_replicate_object_aborts_if_dest_exists():
     ))
 
     with pytest.raises(AssertionError):
-        replicate_object(SRC, DST)
+        _run(replicate_object, SRC, DST)
 
 
 # ---------------------------------------------------------------------------
@@ -387,6 +450,385 @@ def test_auto_replica_no_evac_unchanged():
     assert all(c.request.method == "GET" for c in respx.calls)
 
 
+
+# ---------------------------------------------------------------------------
+# auto_replica concurrency
+# ---------------------------------------------------------------------------
+
+def _single_copy_bucket(keys):
+    contents = {"objects": {
+        key: {"size": len(CONTENT), "directory": False, "checksum": CKSUM,
+              "locations": [SERVER_A], "error": False}
+        for key in keys}}
+    respx.get(LOCATOR + BUCKET + "/").mock(return_value=httpx.Response(200, json=contents))
+    health = {"servers": {SERVER_A: _health(), SERVER_B: _health()}}
+    respx.get(LOCATOR + "health").mock(return_value=httpx.Response(200, json=health))
+    respx.head(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(200))
+
+
+@respx.mock
+def test_auto_replica_copies_concurrently_within_per_dest_limit(monkeypatch):
+    monkeypatch.setattr("simpler_objects.async_replicate.CONCURRENCY", 8)
+    monkeypatch.setattr("simpler_objects.async_replicate.PER_DEST", 3)
+    keys = [f"obj-{i}.bin" for i in range(10)]
+    _single_copy_bucket(keys)
+    in_flight = []
+    peak = []
+
+    async def slow_put(request):
+        in_flight.append(request)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.02)
+        in_flight.remove(request)
+        return httpx.Response(201)
+
+    for key in keys:
+        _mock_replication(SERVER_A, SERVER_B, key).mock(side_effect=slow_put)
+
+    assert auto_replica(LOCATOR, BUCKET, 2) is True
+    assert len(peak) == len(keys)
+    assert max(peak) == 3
+
+
+@respx.mock
+def test_auto_replica_failed_copy_raises():
+    """A failed copy still aborts the run, as it did when copies were serial."""
+    _single_copy_bucket([KEY])
+    _mock_replication(SERVER_A, SERVER_B, KEY).mock(return_value=httpx.Response(500))
+    with pytest.raises(httpx.HTTPStatusError):
+        auto_replica(LOCATOR, BUCKET, 2)
+
+@respx.mock
+def test_auto_replica_copies_most_exposed_objects_first(monkeypatch):
+    monkeypatch.setattr("simpler_objects.async_replicate.CONCURRENCY", 1)
+    server_d = "http://server-d/"
+    contents = {"objects": {
+        "two-copies.bin": {"size": 10, "checksum": CKSUM,
+                           "locations": [SERVER_A, SERVER_B], "error": False},
+        "one-copy-big.bin": {"size": 20, "checksum": CKSUM,
+                             "locations": [SERVER_A], "error": False},
+        "one-copy.bin": {"size": 10, "checksum": CKSUM,
+                         "locations": [SERVER_A], "error": False},
+        "evac-only.bin": {"size": 20, "checksum": CKSUM,
+                          "locations": [SERVER_C], "error": False},
+    }}
+    respx.get(LOCATOR + BUCKET + "/").mock(return_value=httpx.Response(200, json=contents))
+    health = {"servers": {SERVER_A: _health(), SERVER_B: _health(), server_d: _health()}}
+    respx.get(LOCATOR + "health").mock(return_value=httpx.Response(200, json=health))
+    for server in (SERVER_A, SERVER_B, server_d):
+        respx.head(server + BUCKET + "/").mock(return_value=httpx.Response(200))
+    order = []
+
+    async def fake_replicate(client, src, dst):
+        name = dst.rsplit("/", 1)[1]
+        order.append(name)
+        return contents["objects"][name]["size"]
+
+    monkeypatch.setattr(async_replicate, "replicate_object", fake_replicate)
+    assert auto_replica(LOCATOR, BUCKET, 3, evacuate=[SERVER_C]) is True
+    first = [name for i, name in enumerate(order) if name not in order[:i]]
+    assert first == ["evac-only.bin", "one-copy.bin", "one-copy-big.bin", "two-copies.bin"]
+
+
+# ---------------------------------------------------------------------------
+# auto_replica placement snapshot
+# ---------------------------------------------------------------------------
+
+@respx.mock
+def test_auto_replica_fetches_health_once_per_run():
+    keys = [f"obj-{i}.bin" for i in range(5)]
+    _single_copy_bucket(keys)
+    for key in keys:
+        _mock_replication(SERVER_A, SERVER_B, key)
+
+    assert auto_replica(LOCATOR, BUCKET, 2) is True
+    methods = [(c.request.method, str(c.request.url)) for c in respx.calls]
+    assert methods.count(("GET", LOCATOR + "health")) == 1
+    assert methods.count(("HEAD", SERVER_B + BUCKET + "/")) == 1
+
+
+@respx.mock
+def test_auto_replica_debits_planned_bytes(monkeypatch):
+    monkeypatch.setattr("simpler_objects.async_replicate.CONCURRENCY", 1)
+    # always take the first candidate: B while it has room, then C
+    monkeypatch.setattr("simpler_objects.async_replicate.random.choices",
+                        lambda population, weights: [population[0]])
+    keys = ["one.bin", "two.bin"]
+    _single_copy_bucket(keys)
+    # room for exactly one more object on B once the 1 MiB margin is kept
+    tight = _health(available=1024 * 1024 + len(CONTENT) * 3 // 2)
+    health = {"servers": {SERVER_A: _health(), SERVER_B: tight, SERVER_C: _health()}}
+    respx.get(LOCATOR + "health").mock(return_value=httpx.Response(200, json=health))
+    respx.head(SERVER_C + BUCKET + "/").mock(return_value=httpx.Response(200))
+    to_b = [_mock_replication(SERVER_A, SERVER_B, key) for key in keys]
+    to_c = [_mock_replication(SERVER_A, SERVER_C, key) for key in keys]
+
+    assert auto_replica(LOCATOR, BUCKET, 2) is True
+    assert [r.called for r in to_b].count(True) == 1
+    assert [r.called for r in to_c].count(True) == 1
+
+
+@respx.mock
+def test_auto_replica_refreshes_snapshot_on_byte_budget(monkeypatch):
+    monkeypatch.setattr("simpler_objects.async_replicate.SNAPSHOT_BYTES", 1)
+    keys = ["one.bin", "two.bin", "three.bin"]
+    _single_copy_bucket(keys)
+    for key in keys:
+        _mock_replication(SERVER_A, SERVER_B, key)
+
+    assert auto_replica(LOCATOR, BUCKET, 2) is True
+    health_calls = [c for c in respx.calls if str(c.request.url) == LOCATOR + "health"]
+    assert len(health_calls) == 3
+
+
+@respx.mock
+def test_auto_replica_never_picks_a_destination_twice():
+    _single_copy_bucket([KEY])
+    health = {"servers": {SERVER_A: _health(), SERVER_B: _health(), SERVER_C: _health()}}
+    respx.get(LOCATOR + "health").mock(return_value=httpx.Response(200, json=health))
+    respx.head(SERVER_C + BUCKET + "/").mock(return_value=httpx.Response(200))
+    to_b = _mock_replication(SERVER_A, SERVER_B, KEY)
+    to_c = _mock_replication(SERVER_A, SERVER_C, KEY)
+
+    assert auto_replica(LOCATOR, BUCKET, 3) is True
+    assert to_b.call_count == 1 and to_c.call_count == 1
+
+
+# ---------------------------------------------------------------------------
+# auto_replica with change-feed checkpoints
+# ---------------------------------------------------------------------------
+
+def _feed(server, changes, offset, file_id="7:42"):
+    """Mock server's change feed for BUCKET; return the route."""
+    return respx.get(server + BUCKET + "/").mock(return_value=httpx.Response(200, json={
+        "bucket": BUCKET, "file-id": file_id, "offset": offset, "reset": False,
+        "changes": [{"key": k, "checksum": "ab" * 32, "size": len(CONTENT)}
+                    for k in changes],
+    }))
+
+
+def _state(tmp_path):
+    return json.loads((tmp_path / f"{BUCKET}.json").read_text())
+
+
+@respx.mock
+def test_auto_replica_first_run_is_full_and_saves_checkpoints(tmp_path):
+    _single_copy_bucket([KEY])
+    _feed(SERVER_A, [KEY], 100)
+    _feed(SERVER_B, [], 0, file_id=None)
+    put_route = _mock_replication(SERVER_A, SERVER_B, KEY)
+
+    assert auto_replica(LOCATOR, BUCKET, 2, state_dir=str(tmp_path)) is True
+    assert put_route.called
+    state = _state(tmp_path)
+    assert state["servers"] == {SERVER_A: {"file-id": "7:42", "offset": 100},
+                                SERVER_B: {"file-id": None, "offset": 0}}
+    assert state["full"] > 0
+
+
+@respx.mock
+def test_auto_replica_incremental_only_copies_changed_keys(tmp_path):
+    (tmp_path / f"{BUCKET}.json").write_text(json.dumps({
+        "servers": {SERVER_A: {"file-id": "7:42", "offset": 100},
+                    SERVER_B: {"file-id": "9:1", "offset": 50}},
+        "full": time.time(), "replicas": 2}))
+    health = {"servers": {SERVER_A: _health(), SERVER_B: _health()}}
+    respx.get(LOCATOR + "health").mock(return_value=httpx.Response(200, json=health))
+    listing = respx.get(LOCATOR + BUCKET + "/").mock(return_value=httpx.Response(500))
+    feed_a = _feed(SERVER_A, ["new.bin"], 180)
+    _feed(SERVER_B, [], 50, file_id="9:1")
+    locate = respx.post(LOCATOR + BUCKET + "/_locate").mock(return_value=httpx.Response(
+        200, json={"bucket": BUCKET, "locations": {"new.bin": [SERVER_A]}, "unreachable": []}))
+    respx.head(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(200))
+    put_route = _mock_replication(SERVER_A, SERVER_B, "new.bin")
+
+    assert auto_replica(LOCATOR, BUCKET, 2, state_dir=str(tmp_path)) is True
+    assert not listing.called
+    assert put_route.called
+    assert json.loads(locate.calls.last.request.content) == {"keys": ["new.bin"]}
+    params = feed_a.calls.last.request.url.params
+    assert params["changes-since"] == "100" and params["file-id"] == "7:42"
+    assert _state(tmp_path)["servers"][SERVER_A] == {"file-id": "7:42", "offset": 180}
+
+
+def _fresh_checkpoint(tmp_path, replicas=2):
+    (tmp_path / f"{BUCKET}.json").write_text(json.dumps({
+        "servers": {SERVER_B: {"file-id": "9:1", "offset": 50}},
+        "full": time.time(), "replicas": replicas}))
+
+
+@respx.mock
+def test_auto_replica_evac_with_state_dir_is_full(tmp_path):
+    """--evac must consider every object, not only those committed since the checkpoint."""
+    _fresh_checkpoint(tmp_path)
+    contents = {"objects": {
+        KEY: {"size": len(CONTENT), "directory": False, "checksum": CKSUM,
+              "locations": [SERVER_A, SERVER_B], "error": False},
+    }}
+    listing = respx.get(LOCATOR + BUCKET + "/").mock(
+        return_value=httpx.Response(200, json=contents))
+    health = {"servers": {SERVER_A: _health(), SERVER_B: _health(), SERVER_C: _health()}}
+    respx.get(LOCATOR + "health").mock(return_value=httpx.Response(200, json=health))
+    for server in (SERVER_A, SERVER_B, SERVER_C):
+        _feed(server, [], 50, file_id="9:1")
+    respx.head(SERVER_C + BUCKET + "/").mock(return_value=httpx.Response(200))
+    put_route = _mock_replication(SERVER_B, SERVER_C, KEY)
+
+    assert auto_replica(LOCATOR, BUCKET, 2, evacuate=[SERVER_A],
+                        state_dir=str(tmp_path)) is True
+    assert listing.called
+    assert put_route.called
+
+
+@respx.mock
+def test_auto_replica_changed_replicas_with_state_dir_is_full(tmp_path):
+    """Raising the replica count must reach old objects too."""
+    _fresh_checkpoint(tmp_path, replicas=1)
+    _single_copy_bucket([KEY])
+    _feed(SERVER_A, [], 0, file_id=None)
+    _feed(SERVER_B, [], 50, file_id="9:1")
+    put_route = _mock_replication(SERVER_A, SERVER_B, KEY)
+
+    assert auto_replica(LOCATOR, BUCKET, 2, state_dir=str(tmp_path)) is True
+    assert put_route.called
+    assert _state(tmp_path)["replicas"] == 2
+
+
+@respx.mock
+def test_auto_replica_dropped_server_with_state_dir_is_full(tmp_path):
+    """Copies lost with a server removed from the cluster appear in no change feed."""
+    (tmp_path / f"{BUCKET}.json").write_text(json.dumps({
+        "servers": {SERVER_A: {"file-id": None, "offset": 0},
+                    SERVER_B: {"file-id": "9:1", "offset": 50},
+                    SERVER_C: {"file-id": "3:3", "offset": 70}},
+        "full": time.time(), "replicas": 2}))
+    _single_copy_bucket([KEY])          # /health lists only A and B now
+    _feed(SERVER_A, [], 0, file_id=None)
+    _feed(SERVER_B, [], 50, file_id="9:1")
+    put_route = _mock_replication(SERVER_A, SERVER_B, KEY)
+
+    assert auto_replica(LOCATOR, BUCKET, 2, state_dir=str(tmp_path)) is True
+    assert put_route.called
+    assert set(_state(tmp_path)["servers"]) == {SERVER_A, SERVER_B}
+
+
+@respx.mock
+def test_auto_replica_unreadable_feed_keeps_checkpoints(tmp_path):
+    saved = {"servers": {SERVER_A: {"file-id": "7:42", "offset": 100}}, "full": time.time(),
+             "replicas": 2}
+    (tmp_path / f"{BUCKET}.json").write_text(json.dumps(saved))
+    health = {"servers": {SERVER_A: _health(), SERVER_B: _health()}}
+    respx.get(LOCATOR + "health").mock(return_value=httpx.Response(200, json=health))
+    _feed(SERVER_A, ["new.bin"], 180)
+    respx.get(SERVER_B + BUCKET + "/").mock(side_effect=httpx.ConnectError("down"))
+
+    with pytest.warns(UserWarning, match="server-b"):
+        assert auto_replica(LOCATOR, BUCKET, 2, state_dir=str(tmp_path)) is False
+    assert _state(tmp_path) == saved
+
+# ---------------------------------------------------------------------------
+# rate limits
+# ---------------------------------------------------------------------------
+
+def test_token_bucket_bursts_then_paces(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(async_replicate.time, "monotonic", lambda: 100.0)
+    monkeypatch.setattr(async_replicate.asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket(1000)
+
+    async def main():
+        await bucket.take(1000)     # the burst
+        await bucket.take(500)      # half a second of debt
+        await bucket.take(500)      # queued behind it
+    asyncio.run(main())
+    assert sleeps == [0.5, 1.0]
+
+
+def test_throttle_configure_updates_server_buckets():
+    throttle = Throttle({"REPLICATION_SERVER_BYTES_PER_SEC": "100"})
+    asyncio.run(throttle.transfer(10, SERVER_A))
+    assert throttle.server_bytes[SERVER_A].rate == 100
+    throttle.configure({"REPLICATION_SERVER_BYTES_PER_SEC": "50", "REPLICATION_BYTES_PER_SEC": "9"})
+    assert throttle.server_bytes[SERVER_A].rate == 50
+    assert throttle.bytes.rate == 9
+
+
+def test_reload_limits_rereads_env_file(tmp_path, monkeypatch):
+    env_file = tmp_path / "async-replicate.env"
+    env_file.write_text("# comment\nREPLICATION_REQUESTS_PER_SEC=\"20\"\nBUCKETS=a b\n")
+    monkeypatch.setattr(async_replicate, "ENV_FILE", str(env_file))
+    monkeypatch.setattr(async_replicate, "THROTTLE", Throttle({}))
+    reload_limits()
+    assert async_replicate.THROTTLE.requests.rate == 20
+
+
+def test_reload_limits_lifts_a_limit_removed_from_env_file(tmp_path, monkeypatch):
+    """Under systemd the file's values are also in os.environ; the file must win."""
+    env_file = tmp_path / "async-replicate.env"
+    env_file.write_text("REPLICATION_BYTES_PER_SEC=50000000\n")
+    monkeypatch.setenv("REPLICATION_BYTES_PER_SEC", "50000000")
+    monkeypatch.setenv("REPLICATION_REQUESTS_PER_SEC", "7")    # not from the file
+    monkeypatch.setattr(async_replicate, "ENV_FILE", str(env_file))
+    monkeypatch.setattr(async_replicate, "_env_file_keys", frozenset())
+    monkeypatch.setattr(async_replicate, "THROTTLE", Throttle(os.environ))
+    async_replicate.remember_env_file()
+    env_file.write_text("# REPLICATION_BYTES_PER_SEC=50000000\n")
+    reload_limits()
+    assert async_replicate.THROTTLE.bytes.rate == 0
+    assert async_replicate.THROTTLE.requests.rate == 7
+
+
+@respx.mock
+def test_sighup_between_runs_applies_at_next_run(tmp_path, monkeypatch):
+    env_file = tmp_path / "async-replicate.env"
+    env_file.write_text("REPLICATION_REQUESTS_PER_SEC=1000\n")
+    monkeypatch.setattr(async_replicate, "ENV_FILE", str(env_file))
+    monkeypatch.setattr(async_replicate, "THROTTLE", Throttle({}))
+    monkeypatch.setattr(async_replicate, "_reload_pending", False)
+    previous = signal.signal(signal.SIGHUP, async_replicate._note_reload)
+    try:
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert async_replicate._reload_pending
+        respx.get(LOCATOR + BUCKET + "/").mock(
+            return_value=httpx.Response(200, json={"objects": {}}))
+        assert auto_replica(LOCATOR, BUCKET, 2) is True
+        assert async_replicate.THROTTLE.requests.rate == 1000
+        assert signal.getsignal(signal.SIGHUP) is async_replicate._note_reload
+    finally:
+        signal.signal(signal.SIGHUP, previous)
+
+
+class _RecordingThrottle(Throttle):
+    def __init__(self):
+        super().__init__({})
+        self.requests_seen = []
+        self.transfers = []
+
+    async def request(self, server):
+        self.requests_seen.append(server)
+
+    async def transfer(self, size, *servers):
+        self.transfers.append((size, servers))
+
+
+@respx.mock
+def test_auto_replica_throttles_requests_and_bytes(monkeypatch):
+    throttle = _RecordingThrottle()
+    monkeypatch.setattr(async_replicate, "THROTTLE", throttle)
+    _single_copy_bucket([KEY])
+    _mock_replication(SERVER_A, SERVER_B, KEY)
+
+    assert auto_replica(LOCATOR, BUCKET, 2) is True
+    assert throttle.transfers == [(len(CONTENT), (SERVER_A, SERVER_B))]
+    assert throttle.requests_seen.count(LOCATOR) == 2      # listing + health
+    assert throttle.requests_seen.count(SERVER_A) == 2     # HEAD + GET source
+    assert throttle.requests_seen.count(SERVER_B) == 4     # bucket, dest HEADs, PUT
+
+
 # ---------------------------------------------------------------------------
 # cli env-var override
 # ---------------------------------------------------------------------------
@@ -396,7 +838,7 @@ def test_cli_dash_bucket_uses_underscore_env_var(monkeypatch):
     monkeypatch.setenv("REPLICAS_MY_BACKUPS", "5")
     calls = []
 
-    def fake_auto_replica(locator, bucket, replicas, evacuate=()):
+    def fake_auto_replica(locator, bucket, replicas, evacuate=(), **kwargs):
         calls.append((bucket, replicas))
         return True
 
@@ -413,7 +855,7 @@ def test_cli_evac_normalizes_trailing_slash():
     """--evac URLs get a trailing slash appended and are passed to auto_replica."""
     calls = []
 
-    def fake_auto_replica(locator, bucket, replicas, evacuate=()):
+    def fake_auto_replica(locator, bucket, replicas, evacuate=(), **kwargs):
         calls.append((bucket, replicas, evacuate))
         return True
 
@@ -1,7 +1,11 @@
 """Tests for simpler_objects.common shared utilities."""
 
+import os
+
 import pytest
-from simpler_objects.common import filter_write_candidates, parse_checksum_line
+from simpler_objects.common import (ChecksumFile, ChecksumIndex, filter_write_candidates,
+                                    iter_checksum_file, parse_checksum_line,
+                                    rendezvous_rank)
 
 SERVER = "http://node1:29171/"
 MB = 1024 * 1024
@@ -49,6 +53,27 @@ def test_multiple_servers_weighted():
     assert result[s2] == 100 * MB * 50
 
 
+# --- rendezvous_rank ---
+
+def test_rendezvous_rank_deterministic():
+    weights = {"http://a/": 1, "http://b/": 1, "http://c/": 1}
+    assert rendezvous_rank("bucket/key", weights) == rendezvous_rank("bucket/key", dict(weights))
+    assert sorted(rendezvous_rank("bucket/key", weights)) == sorted(weights)
+
+def test_rendezvous_rank_removal_keeps_order():
+    weights = {"http://a/": 3, "http://b/": 2, "http://c/": 1}
+    for i in range(50):
+        ranked = rendezvous_rank(f"bucket/{i}", weights)
+        fewer = dict(weights)
+        del fewer[ranked[0]]
+        assert rendezvous_rank(f"bucket/{i}", fewer) == ranked[1:]
+
+def test_rendezvous_rank_follows_weights():
+    weights = {"http://a/": 3, "http://b/": 1}
+    wins = sum(rendezvous_rank(f"bucket/{i}", weights)[0] == "http://a/" for i in range(2000))
+    assert 1350 < wins < 1650
+
+
 # --- parse_checksum_line ---
 
 VALID_HEX = "a" * 64
@@ -79,3 +104,48 @@ def test_parse_checksum_line_valid(line, expected):
 ])
 def test_parse_checksum_line_invalid(line):
     assert parse_checksum_line(line) is None
+
+
+# --- ChecksumIndex ---
+
+def test_checksum_index_tails_appends(tmp_path):
+    bucket = tmp_path / "bucket"
+    bucket.mkdir()
+    cksum = ChecksumFile(bucket)
+    index = ChecksumIndex(cksum.path)
+    assert index.lookup("a.bin") is None
+    cksum.append("a.bin", bytes.fromhex(VALID_HEX))
+    assert index.lookup("a.bin") == bytes.fromhex(VALID_HEX)
+    cksum.append("b.bin", bytes.fromhex("b" * 64))
+    assert index.lookup("b.bin") == bytes.fromhex("b" * 64)
+
+
+def test_checksum_index_waits_for_complete_line(tmp_path):
+    path = tmp_path / "bucket.sha256"
+    path.write_text(f"{VALID_HEX}  a.b")
+    index = ChecksumIndex(path)
+    assert index.lookup("a.b") is None
+    with open(path, "a", encoding="utf-8") as fp:
+        fp.write("in\n")
+    assert index.lookup("a.bin") == bytes.fromhex(VALID_HEX)
+    assert index.lookup("a.b") is None
+
+
+def test_checksum_index_rebuilds_on_rewrite(tmp_path):
+    path = tmp_path / "bucket.sha256"
+    path.write_text(f"{VALID_HEX}  a.bin\n")
+    index = ChecksumIndex(path)
+    assert index.lookup("a.bin") is not None
+    new = tmp_path / "bucket.sha256.new"
+    new.write_text(f"{'c' * 64}  c.bin\n")
+    os.replace(new, path)
+    assert index.lookup("a.bin") is None
+    assert index.lookup("c.bin") == bytes.fromhex("c" * 64)
+
+
+def test_checksum_append_many_plain_format(tmp_path):
+    cksum = ChecksumFile(tmp_path / "bucket")
+    cksum.append_many([("a.bin", bytes.fromhex(VALID_HEX)),
+                       ("b.bin", bytes.fromhex("b" * 64))])
+    assert cksum.path.read_text() == f"{VALID_HEX}  a.bin\n{'b' * 64}  b.bin\n"
+    assert list(iter_checksum_file(cksum.path)) == [(VALID_HEX, "a.bin"), ("b" * 64, "b.bin")]
@@ -10,11 +10,16 @@ transport, not a production bug; a real client follows the redirect once to a
 genuinely different host. Assert the 307 and its Location directly instead.
 """
 
+import asyncio
+import json
+import time
+
 import httpx
 import pytest
 import respx
 
 import simpler_objects.locator_api as locator
+from simpler_objects.common import rendezvous_rank
 from tests.openapi_validation import ValidatingTestClient
 
 SERVER_A = "http://server-a/"
@@ -38,6 +43,9 @@ def _health(write=True, available=10 ** 9, percent=50):
 @pytest.fixture()
 def client(monkeypatch):
     monkeypatch.setattr(locator, "OBJECT_SERVERS", f"{SERVER_A},{SERVER_B}")
+    # No background health poller: it would race each test's respx mocks.
+    # Health is then fetched on demand, as on a cold start.
+    monkeypatch.setattr(locator, "HEALTH_INTERVAL", 0)
     # Context manager so the lifespan handler runs and sets app.state.client.
     with ValidatingTestClient(locator.app) as test_client:
         yield test_client
@@ -77,6 +85,81 @@ def test_health_server_down(client):
     assert data["servers"][SERVER_B]["write"] is True
 
 
+@respx.mock
+def test_health_served_from_snapshot(client):
+    """Fresh snapshot entries are served without asking the servers again."""
+    route_a = respx.get(SERVER_A + "health").mock(return_value=httpx.Response(200, json=_health()))
+    respx.get(SERVER_B + "health").mock(return_value=httpx.Response(200, json=_health()))
+    client.get("/health")
+    client.get("/health")
+    assert route_a.call_count == 1
+
+
+@respx.mock
+def test_health_stale_snapshot_refetched(client, monkeypatch):
+    """Entries older than HEALTH_MAX_AGE are fetched again."""
+    monkeypatch.setattr(locator, "HEALTH_MAX_AGE", -1)
+    route_a = respx.get(SERVER_A + "health").mock(return_value=httpx.Response(200, json=_health()))
+    respx.get(SERVER_B + "health").mock(return_value=httpx.Response(200, json=_health()))
+    client.get("/health")
+    client.get("/health")
+    assert route_a.call_count == 2
+
+
+@respx.mock
+def test_health_poller_fills_snapshot(monkeypatch):
+    """The background poller refreshes every server without any request."""
+    monkeypatch.setattr(locator, "OBJECT_SERVERS", f"{SERVER_A},{SERVER_B}")
+    monkeypatch.setattr(locator, "HEALTH_INTERVAL", 0.01)
+    route_a = respx.get(SERVER_A + "health").mock(return_value=httpx.Response(200, json=_health()))
+    respx.get(SERVER_B + "health").mock(return_value=httpx.Response(200, json=_health(write=False)))
+    with ValidatingTestClient(locator.app) as test_client:
+        deadline = time.monotonic() + 5
+        while route_a.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        snapshot = test_client.app.state.health
+        assert snapshot.get(SERVER_A)["write"] is True
+        assert snapshot.get(SERVER_B)["write"] is False
+    assert route_a.call_count >= 2
+
+
+@respx.mock
+def test_health_poller_survives_a_failed_round(monkeypatch, caplog):
+    """A bad round (non-JSON health, a failing sweep) is logged and polling goes on."""
+    monkeypatch.setattr(locator, "OBJECT_SERVERS", f"{SERVER_A},{SERVER_B}")
+    monkeypatch.setattr(locator, "HEALTH_INTERVAL", 0.01)
+    route_a = respx.get(SERVER_A + "health").mock(
+        return_value=httpx.Response(200, content=b"<html>proxy error</html>"))
+    respx.get(SERVER_B + "health").mock(return_value=httpx.Response(200, json=_health()))
+    sweeps = []
+
+    async def failing_sweep(reservations):
+        sweeps.append(1)
+        raise RuntimeError("sweep broke")
+    monkeypatch.setattr(locator, "sweep_reservations", failing_sweep)
+    with ValidatingTestClient(locator.app) as test_client:
+        deadline = time.monotonic() + 5
+        while len(sweeps) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert test_client.app.state.health.get(SERVER_A)["read"] is False
+    assert len(sweeps) >= 3
+    assert route_a.call_count >= 3
+    assert "Health poll round failed" in caplog.text
+
+
+@respx.mock
+def test_add_object_failed_target_invalidated(client):
+    """A server failing the existence check is marked down for later PUTs."""
+    respx.get(SERVER_A + "health").mock(return_value=httpx.Response(200, json=_health()))
+    respx.get(SERVER_B + "health").mock(return_value=httpx.Response(200, json=_health()))
+    respx.head(SERVER_A + OBJ_PATH).mock(side_effect=httpx.ConnectError("down"))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(404))
+    respx.head(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(200))
+    client.put(f"/{OBJ_PATH}", headers={"Content-Length": "100"}, follow_redirects=False)
+    assert locator.app.state.health.get(SERVER_A)["write"] is False
+    assert locator.app.state.health.get(SERVER_B)["write"] is True
+
+
 # ---------------------------------------------------------------------------
 # GET/HEAD /{bucket}/{key}
 # ---------------------------------------------------------------------------
@@ -164,6 +247,197 @@ def test_find_object_busy_then_found(client):
     assert resp.status_code == 307
 
 
+@respx.mock
+def test_find_object_cached_location_skips_fanout(client):
+    """A second GET for a found key redirects without any HEAD."""
+    head_a = respx.head(SERVER_A + OBJ_PATH).mock(return_value=httpx.Response(200))
+    head_b = respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(200))
+    first = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    calls = head_a.call_count + head_b.call_count
+    second = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert second.status_code == 307
+    assert second.headers["location"] == first.headers["location"]
+    assert head_a.call_count + head_b.call_count == calls
+
+
+@pytest.mark.parametrize("failure", ["down", "circuit"])
+@respx.mock
+def test_find_object_cached_location_on_failed_server_refetched(client, failure):
+    """A cached location on a server known to be down falls back to the fan-out."""
+    head_a = respx.head(SERVER_A + OBJ_PATH).mock(return_value=httpx.Response(200))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(404))
+    first = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert first.headers["location"] == SERVER_A + OBJ_PATH
+    head_a.mock(side_effect=httpx.ConnectError("down"))
+    head_b = respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(200))
+    if failure == "down":
+        locator.app.state.health.invalidate(SERVER_A)
+    else:
+        for _ in range(locator.CIRCUIT_ERRORS):
+            locator.app.state.server_stats.record(SERVER_A, 1.0, False)
+    second = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert second.status_code == 307
+    assert second.headers["location"] == SERVER_B + OBJ_PATH
+    assert head_b.called
+
+
+@respx.mock
+def test_find_object_negative_cache(client):
+    """A 404 from every server is remembered briefly."""
+    head_a = respx.head(SERVER_A + OBJ_PATH).mock(return_value=httpx.Response(404))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(404))
+    assert client.get(f"/{OBJ_PATH}", follow_redirects=False).status_code == 404
+    assert client.get(f"/{OBJ_PATH}", follow_redirects=False).status_code == 404
+    assert head_a.call_count == 1
+
+
+@respx.mock
+def test_find_object_partial_404_not_cached(client):
+    """A miss while a server was unreachable is not remembered."""
+    head_a = respx.head(SERVER_A + OBJ_PATH).mock(side_effect=httpx.ConnectError("down"))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(404))
+    client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert head_a.call_count == 2
+
+
+@respx.mock
+def test_add_object_clears_negative_cache(client):
+    """A PUT through this locator forgets the key's cached 404."""
+    respx.head(SERVER_A + OBJ_PATH).mock(return_value=httpx.Response(404))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(404))
+    respx.get(SERVER_A + "health").mock(return_value=httpx.Response(200, json=_health()))
+    respx.get(SERVER_B + "health").mock(return_value=httpx.Response(200, json=_health()))
+    respx.head(SERVER_A + BUCKET + "/").mock(return_value=httpx.Response(200))
+    respx.head(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(200))
+    client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    client.put(f"/{OBJ_PATH}", headers={"Content-Length": "100"}, follow_redirects=False)
+    respx.head(SERVER_A + OBJ_PATH).mock(return_value=httpx.Response(200))
+    resp = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert resp.status_code == 307
+
+
+@respx.mock
+def test_find_object_verify_falls_back_to_fanout(client, monkeypatch):
+    """With verification, a cached server that lost the object is re-probed."""
+    monkeypatch.setattr(locator, "LOCATION_CACHE_VERIFY", True)
+    locator.app.state.location_cache.found(OBJ_PATH, SERVER_A)
+    respx.head(SERVER_A + OBJ_PATH).mock(return_value=httpx.Response(404))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(200))
+    resp = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert resp.status_code == 307
+    assert resp.headers["location"] == SERVER_B + OBJ_PATH
+
+
+@respx.mock
+def test_find_object_verifies_aged_cache_entry(client, monkeypatch):
+    """An object removed from a live server is not redirected to for the TTL."""
+    monkeypatch.setattr(locator, "LOCATION_CACHE_VERIFY_AFTER", 60)
+    locator.app.state.location_cache.found(OBJ_PATH, SERVER_A)
+    head_a = respx.head(SERVER_A + OBJ_PATH).mock(return_value=httpx.Response(404))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(200))
+    recent = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert recent.headers["location"] == SERVER_A + OBJ_PATH
+    assert not head_a.called
+    monkeypatch.setattr(locator, "LOCATION_CACHE_VERIFY_AFTER", 0)
+    aged = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert aged.headers["location"] == SERVER_B + OBJ_PATH
+
+
+async def _hang(request):
+    await asyncio.sleep(5)
+    return httpx.Response(200)
+
+
+@pytest.mark.parametrize("mode", ["hedged", "parallel"])
+@respx.mock
+def test_find_object_hedged_skips_slow_server(client, monkeypatch, mode):
+    """A replica that never answers does not hold up one that does."""
+    monkeypatch.setattr(locator, "LOOKUP_MODE", mode)
+    monkeypatch.setattr(locator, "LOOKUP_HEDGE_FIRST", 1)
+    monkeypatch.setattr(locator, "LOOKUP_HEDGE_DELAY", 0.01)
+    respx.head(SERVER_A + OBJ_PATH).mock(side_effect=_hang)
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(200))
+    start = time.monotonic()
+    resp = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert time.monotonic() - start < 2
+    assert resp.status_code == 307
+    assert resp.headers["location"] == SERVER_B + OBJ_PATH
+
+
+@pytest.mark.parametrize("mode", ["hedged", "parallel"])
+@respx.mock
+def test_find_object_hedged_busy_returns_503(client, monkeypatch, mode):
+    monkeypatch.setattr(locator, "LOOKUP_MODE", mode)
+    respx.head(SERVER_A + OBJ_PATH).mock(
+        return_value=httpx.Response(503, headers={"Retry-After": "64"}))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(404))
+    resp = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "64"
+
+
+@pytest.mark.parametrize("mode", ["hedged", "parallel"])
+@respx.mock
+def test_find_object_hedged_not_found_cached(client, monkeypatch, mode):
+    monkeypatch.setattr(locator, "LOOKUP_MODE", mode)
+    monkeypatch.setattr(locator, "LOOKUP_HEDGE_FIRST", 1)
+    head_a = respx.head(SERVER_A + OBJ_PATH).mock(return_value=httpx.Response(404))
+    head_b = respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(404))
+    assert client.get(f"/{OBJ_PATH}", follow_redirects=False).status_code == 404
+    assert client.get(f"/{OBJ_PATH}", follow_redirects=False).status_code == 404
+    assert head_a.call_count == head_b.call_count == 1
+
+
+@respx.mock
+def test_find_object_circuit_opens_after_errors(client, monkeypatch):
+    """A server that keeps failing is skipped instead of waited on."""
+    monkeypatch.setattr(locator, "CIRCUIT_ERRORS", 2)
+    head_a = respx.head(SERVER_A + OBJ_PATH).mock(side_effect=httpx.ConnectError("down"))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(404))
+    for _ in range(4):
+        assert client.get(f"/{OBJ_PATH}", follow_redirects=False).status_code == 404
+    assert head_a.call_count == 2
+
+
+@respx.mock
+def test_find_object_half_open_trial_closes_circuit(client, monkeypatch):
+    """After CIRCUIT_RESET one request is let through; success closes the circuit."""
+    monkeypatch.setattr(locator, "CIRCUIT_ERRORS", 1)
+    monkeypatch.setattr(locator, "LOCATION_CACHE_SIZE", 0)
+    stats = locator.app.state.server_stats
+    stats.record(SERVER_A, 1.0, False)
+    assert stats.is_open(SERVER_A)
+    monkeypatch.setattr(locator, "CIRCUIT_RESET", 0)
+    respx.head(SERVER_A + OBJ_PATH).mock(return_value=httpx.Response(200))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(404))
+    resp = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert resp.headers["location"] == SERVER_A + OBJ_PATH
+    assert stats.errors[SERVER_A] == 0
+    assert SERVER_A in stats.order([SERVER_A, SERVER_B])
+
+
+@respx.mock
+def test_find_object_fastest_server_first(client):
+    """Servers are probed in order of their latency average."""
+    stats = locator.app.state.server_stats
+    stats.record(SERVER_A, 0.5, True)
+    stats.record(SERVER_B, 0.01, True)
+    head_a = respx.head(SERVER_A + OBJ_PATH).mock(return_value=httpx.Response(200))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(200))
+    resp = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert resp.headers["location"] == SERVER_B + OBJ_PATH
+    assert head_a.call_count == 0
+
+
+def test_server_stats_ewma(monkeypatch):
+    monkeypatch.setattr(locator, "LATENCY_EWMA_ALPHA", 0.5)
+    stats = locator.ServerStats()
+    stats.record(SERVER_A, 1.0, True)
+    stats.record(SERVER_A, 3.0, True)
+    assert stats.latency[SERVER_A] == 2.0
+
+
 # ---------------------------------------------------------------------------
 # PUT /{bucket}/{key}
 # ---------------------------------------------------------------------------
@@ -225,6 +499,95 @@ def test_add_object_success(client):
     assert OBJ_PATH in resp.headers["location"]
 
 
+@respx.mock
+def test_add_object_rendezvous_placement_found_first(client, monkeypatch):
+    """With rendezvous placement, a GET's first HEAD goes where the PUT went."""
+    monkeypatch.setattr(locator, "PLACEMENT", "rendezvous")
+    respx.get(SERVER_A + "health").mock(return_value=httpx.Response(200, json=_health()))
+    respx.get(SERVER_B + "health").mock(return_value=httpx.Response(200, json=_health()))
+    respx.head(SERVER_A + OBJ_PATH).mock(return_value=httpx.Response(404))
+    respx.head(SERVER_B + OBJ_PATH).mock(return_value=httpx.Response(404))
+    respx.head(SERVER_A + BUCKET + "/").mock(return_value=httpx.Response(200))
+    respx.head(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(200))
+    resp = client.put(f"/{OBJ_PATH}", headers={"Content-Length": "100"}, follow_redirects=False)
+    placed = resp.headers["location"].removesuffix(OBJ_PATH)
+    assert placed == rendezvous_rank(OBJ_PATH, {SERVER_A: 1, SERVER_B: 1})[0]
+    other = SERVER_B if placed == SERVER_A else SERVER_A
+    respx.head(placed + OBJ_PATH).mock(return_value=httpx.Response(200))
+    head_other = respx.head(other + OBJ_PATH).mock(return_value=httpx.Response(404))
+    calls = head_other.call_count
+    resp = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert resp.headers["location"] == placed + OBJ_PATH
+    assert head_other.call_count == calls
+
+
+def _mock_put_targets(keys, available=10 ** 9):
+    """Mock a PUT of each key to either server; return the key HEAD routes."""
+    routes = {}
+    for server in (SERVER_A, SERVER_B):
+        respx.get(server + "health").mock(
+            return_value=httpx.Response(200, json=_health(available=available)))
+        respx.head(server + BUCKET + "/").mock(return_value=httpx.Response(200))
+        for key in keys:
+            routes[server, key] = respx.head(f"{server}{BUCKET}/{key}").mock(
+                return_value=httpx.Response(404))
+    return routes
+
+
+@respx.mock
+def test_add_object_reserved_space_not_offered_twice(client):
+    """Concurrent PUTs do not all land on space only one of them can have."""
+    _mock_put_targets(["k0", "k1", "k2", "k3"], available=150 * 1024 * 1024)
+    size = str(100 * 1024 * 1024)
+    first = client.put(f"/{BUCKET}/k1", headers={"Content-Length": size}, follow_redirects=False)
+    second = client.put(f"/{BUCKET}/k2", headers={"Content-Length": size}, follow_redirects=False)
+    third = client.put(f"/{BUCKET}/k3", headers={"Content-Length": size}, follow_redirects=False)
+    assert first.status_code == second.status_code == 307
+    assert (first.headers["location"].removesuffix(f"{BUCKET}/k1")
+            != second.headers["location"].removesuffix(f"{BUCKET}/k2"))
+    assert third.status_code == 507
+
+
+@respx.mock
+def test_add_object_reservation_expires(client, monkeypatch):
+    monkeypatch.setattr(locator, "RESERVATION_TTL", 0)
+    _mock_put_targets(["k0", "k1", "k2", "k3"], available=150 * 1024 * 1024)
+    size = str(100 * 1024 * 1024)
+    for i in range(3):
+        resp = client.put(f"/{BUCKET}/k{i}", headers={"Content-Length": size},
+                          follow_redirects=False)
+        assert resp.status_code == 307
+
+
+@respx.mock
+def test_add_object_upload_cap(client, monkeypatch):
+    """With every server at UPLOADS_PER_SERVER, a PUT is told to retry."""
+    monkeypatch.setattr(locator, "UPLOADS_PER_SERVER", 1)
+    _mock_put_targets(["k1", "k2", "k3"])
+    first = client.put(f"/{BUCKET}/k1", headers={"Content-Length": "100"}, follow_redirects=False)
+    second = client.put(f"/{BUCKET}/k2", headers={"Content-Length": "100"}, follow_redirects=False)
+    assert first.headers["location"] != second.headers["location"]
+    third = client.put(f"/{BUCKET}/k3", headers={"Content-Length": "100"}, follow_redirects=False)
+    assert third.status_code == 503
+    assert third.headers["Retry-After"] == locator.UPLOAD_RETRY_AFTER
+
+
+@respx.mock
+def test_reservation_released_when_committed(client, monkeypatch):
+    """A sweep that finds the object frees its server's upload slot."""
+    monkeypatch.setattr(locator, "UPLOADS_PER_SERVER", 1)
+    routes = _mock_put_targets(["k1", "k2", "k3"])
+    for key in ("k1", "k2"):
+        client.put(f"/{BUCKET}/{key}", headers={"Content-Length": "100"}, follow_redirects=False)
+    for server in (SERVER_A, SERVER_B):
+        routes[server, "k1"].return_value = httpx.Response(200)
+    reservations = locator.app.state.reservations
+    client.portal.call(locator.sweep_reservations, reservations)
+    assert [path for path, _ in reservations.oldest(10)] == [f"{BUCKET}/k2"]
+    third = client.put(f"/{BUCKET}/k3", headers={"Content-Length": "100"}, follow_redirects=False)
+    assert third.status_code == 307
+
+
 @respx.mock
 def test_add_object_unreachable_server_excluded(client):
     """A server that fails the existence check should be dropped from candidates."""
@@ -323,6 +686,17 @@ def test_head_bucket_not_found(client):
     assert resp.status_code == 404
 
 
+@respx.mock
+def test_head_bucket_open_circuit_not_waited_on(client, monkeypatch):
+    """A server with an open circuit counts as unreachable without a request."""
+    monkeypatch.setattr(locator, "CIRCUIT_ERRORS", 1)
+    locator.app.state.server_stats.record(SERVER_A, 8.0, False)
+    head_a = respx.head(SERVER_A + BUCKET + "/").mock(return_value=httpx.Response(200))
+    respx.head(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(404))
+    assert client.head(f"/{BUCKET}/").status_code == 503
+    assert head_a.call_count == 0
+
+
 @respx.mock
 def test_head_bucket_server_error(client):
     respx.head(SERVER_A + BUCKET + "/").mock(return_value=httpx.Response(500))
@@ -405,3 +779,266 @@ def test_list_bucket_missing_on_one_server(client):
     resp = client.get(f"/{BUCKET}/")
     assert resp.status_code == 200
     assert "obj1" in resp.json()["objects"]
+
+
+@pytest.fixture()
+def listing_cache(monkeypatch):
+    """Turn on the (opt-in) merged listing cache."""
+    monkeypatch.setattr(locator, "LISTING_CACHE_BUCKETS", 16)
+
+
+@respx.mock
+def test_list_bucket_uncached_by_default(client):
+    list_a = respx.get(SERVER_A + BUCKET + "/").mock(
+        return_value=httpx.Response(200, json={"bucket": BUCKET, "objects": {"obj1": _entry(13)}}))
+    respx.get(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(404))
+    client.get(f"/{BUCKET}/")
+    client.get(f"/{BUCKET}/")
+    assert list_a.call_count == 2
+    assert "If-None-Match" not in list_a.calls.last.request.headers
+    assert not locator.app.state.listings
+
+
+def _conditional_listing(objects, etag):
+    """respx side effect: the listing with etag, or 304 if it matches."""
+    def serve(request):
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, headers={"ETag": etag},
+                              json={"bucket": BUCKET, "objects": objects})
+    return serve
+
+
+@respx.mock
+def test_list_bucket_cache_revalidates_per_server(client, listing_cache, monkeypatch):
+    """Unchanged servers answer 304; only the changed shard is re-merged."""
+    monkeypatch.setattr(locator, "LISTING_FRESH", 0)
+    monkeypatch.setattr(locator, "LISTING_STALE", 0)
+    list_a = respx.get(SERVER_A + BUCKET + "/").mock(
+        side_effect=_conditional_listing({"obj1": _entry(13)}, '"a1"'))
+    list_b = respx.get(SERVER_B + BUCKET + "/").mock(
+        side_effect=_conditional_listing({"obj1": _entry(13)}, '"b1"'))
+    first = client.get(f"/{BUCKET}/").json()
+    assert first["objects"]["obj1"]["locations"] == [SERVER_A, SERVER_B]
+    list_b.mock(side_effect=_conditional_listing(
+        {"obj1": _entry(13), "obj2": _entry(42)}, '"b2"'))
+    second = client.get(f"/{BUCKET}/").json()
+    assert list_a.calls.last.request.headers["If-None-Match"] == '"a1"'
+    assert list_a.calls.last.response.status_code == 304
+    assert second["objects"]["obj1"]["locations"] == [SERVER_A, SERVER_B]
+    assert second["objects"]["obj2"]["locations"] == [SERVER_B]
+    list_b.mock(side_effect=_conditional_listing({"obj2": _entry(42)}, '"b3"'))
+    third = client.get(f"/{BUCKET}/").json()
+    assert third["objects"]["obj1"]["locations"] == [SERVER_A]
+
+
+@respx.mock
+def test_list_bucket_cache_fresh_not_revalidated(client, listing_cache):
+    list_a = respx.get(SERVER_A + BUCKET + "/").mock(
+        side_effect=_conditional_listing({"obj1": _entry(13)}, '"a1"'))
+    respx.get(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(404))
+    client.get(f"/{BUCKET}/")
+    client.get(f"/{BUCKET}/")
+    assert list_a.call_count == 1
+
+
+@respx.mock
+def test_list_bucket_cache_stale_while_revalidate(client, listing_cache, monkeypatch):
+    """A recent listing is served at once and refreshed behind the response."""
+    monkeypatch.setattr(locator, "LISTING_FRESH", 0)
+    monkeypatch.setattr(locator, "LISTING_STALE", 60)
+    list_a = respx.get(SERVER_A + BUCKET + "/").mock(
+        side_effect=_conditional_listing({"obj1": _entry(13)}, '"a1"'))
+    respx.get(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(404))
+    client.get(f"/{BUCKET}/")
+    list_a.mock(side_effect=_conditional_listing({"obj2": _entry(42)}, '"a2"'))
+    stale = client.get(f"/{BUCKET}/").json()
+    assert set(stale["objects"]) == {"obj1"}
+    deadline = time.monotonic() + 5
+    while list_a.call_count < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    client.portal.call(asyncio.sleep, 0.05)
+    assert set(client.get(f"/{BUCKET}/").json()["objects"]) == {"obj2"}
+
+
+@respx.mock
+def test_list_bucket_cache_error_keeps_previous(client, listing_cache, monkeypatch):
+    monkeypatch.setattr(locator, "LISTING_FRESH", 0)
+    monkeypatch.setattr(locator, "LISTING_STALE", 0)
+    list_a = respx.get(SERVER_A + BUCKET + "/").mock(
+        side_effect=_conditional_listing({"obj1": _entry(13)}, '"a1"'))
+    respx.get(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(404))
+    client.get(f"/{BUCKET}/")
+    list_a.mock(side_effect=httpx.ConnectError("down"))
+    assert client.get(f"/{BUCKET}/").status_code == 503
+    list_a.mock(side_effect=_conditional_listing({"obj1": _entry(13)}, '"a1"'))
+    assert set(client.get(f"/{BUCKET}/").json()["objects"]) == {"obj1"}
+
+
+def _ndjson_listing(objects, order=sorted):
+    """respx side effect serving objects as an NDJSON listing."""
+    def serve(request):
+        assert request.url.params["order"] == "key"
+        assert request.headers["accept"] == "application/x-ndjson"
+        body = "".join(json.dumps({"key": k, **objects[k]}) + "\n" for k in order(objects))
+        return httpx.Response(200, text=body,
+                              headers={"Content-Type": "application/x-ndjson"})
+    return serve
+
+
+def _entry(size, checksum="aa"):
+    return {"size": size, "directory": False, "checksum": checksum}
+
+
+@respx.mock
+def test_list_bucket_ndjson_merged_in_key_order(client):
+    list_a = respx.get(SERVER_A + BUCKET + "/").mock(side_effect=_ndjson_listing(
+        {"a": _entry(1), "c": _entry(3), "d": _entry(4), "e": _entry(5, "bb")}))
+    respx.get(SERVER_B + BUCKET + "/").mock(side_effect=_ndjson_listing(
+        {"b": _entry(2), "c": _entry(3), "e": _entry(5, "cc")}))
+    resp = client.get(f"/{BUCKET}/", headers={"Accept": "application/x-ndjson"})
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["key"] for line in lines] == ["a", "b", "c", "d", "e"]
+    assert lines[2]["locations"] == [SERVER_A, SERVER_B]
+    assert lines[2]["error"] is False
+    assert lines[4]["error"] is True
+    assert lines[4]["checksum"] is None
+    assert list_a.call_count == 1
+
+
+@respx.mock
+def test_list_bucket_ndjson_rejects_unordered_server(client):
+    respx.get(SERVER_A + BUCKET + "/").mock(side_effect=_ndjson_listing(
+        {"b": _entry(2), "a": _entry(1)}, order=list))
+    respx.get(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(404))
+    with pytest.raises(ValueError, match="not in key order"):
+        client.get(f"/{BUCKET}/", headers={"Accept": "application/x-ndjson"})
+
+
+@respx.mock
+def test_list_bucket_ndjson_missing_on_one_server(client):
+    respx.get(SERVER_A + BUCKET + "/").mock(side_effect=_ndjson_listing({"a": _entry(1)}))
+    respx.get(SERVER_B + BUCKET + "/").mock(return_value=httpx.Response(404))
+    resp = client.get(f"/{BUCKET}/", headers={"Accept": "application/x-ndjson"})
+    assert [json.loads(line)["locations"] for line in resp.text.splitlines()] == [[SERVER_A]]
+
+
+@respx.mock
+def test_list_bucket_ndjson_server_down(client):
+    respx.get(SERVER_A + BUCKET + "/").mock(side_effect=_ndjson_listing({"a": _entry(1)}))
+    respx.get(SERVER_B + BUCKET + "/").mock(side_effect=httpx.ConnectError("down"))
+    resp = client.get(f"/{BUCKET}/", headers={"Accept": "application/x-ndjson"})
+    assert resp.status_code == 503
+
+# ---------------------------------------------------------------------------
+# POST /{bucket}/_locate and /{bucket}/_place
+# ---------------------------------------------------------------------------
+
+def _stat(*keys, busy=()):
+    objects = {key: {"size": 5, "checksum": None, "busy": key in busy} for key in keys}
+    return {"bucket": BUCKET, "objects": objects}
+
+
+def _listing(*keys):
+    return {"bucket": BUCKET, "objects": {
+        key: {"size": 5, "directory": False, "checksum": None} for key in keys}}
+
+
+@respx.mock
+def test_locate_objects(client):
+    respx.post(SERVER_A + BUCKET + "/_stat").mock(
+        return_value=httpx.Response(200, json=_stat("doc-1", "doc-2", "doc-4")))
+    respx.post(SERVER_B + BUCKET + "/_stat").mock(
+        return_value=httpx.Response(200, json=_stat("doc-2", "doc-4", busy={"doc-4"})))
+    resp = client.post(f"/{BUCKET}/_locate", json={"keys": ["doc-1", "doc-2", "doc-3", "doc-4"]})
+    assert resp.status_code == 200
+    assert resp.json()["locations"] == {
+        "doc-1": [SERVER_A], "doc-2": [SERVER_A, SERVER_B], "doc-3": [], "doc-4": [SERVER_A]}
+    assert resp.json()["unreachable"] == []
+
+
+@respx.mock
+def test_locate_objects_lists_servers_without_stat(client):
+    """An object server predating _stat is listed by the keys' common prefix."""
+    respx.post(SERVER_A + BUCKET + "/_stat").mock(return_value=httpx.Response(405))
+    list_a = respx.get(SERVER_A + BUCKET + "/").mock(
+        return_value=httpx.Response(200, json=_listing("doc-1", "doc-2", "doc-9")))
+    respx.post(SERVER_B + BUCKET + "/_stat").mock(return_value=httpx.Response(404))
+    resp = client.post(f"/{BUCKET}/_locate", json={"keys": ["doc-1", "doc-3"]})
+    assert resp.json()["locations"] == {"doc-1": [SERVER_A], "doc-3": []}
+    assert list_a.calls.last.request.url.params["prefix"] == "doc-"
+
+
+@respx.mock
+def test_locate_objects_fills_location_cache(client):
+    respx.post(SERVER_A + BUCKET + "/_stat").mock(
+        return_value=httpx.Response(200, json=_stat(KEY)))
+    respx.post(SERVER_B + BUCKET + "/_stat").mock(return_value=httpx.Response(404))
+    client.post(f"/{BUCKET}/_locate", json={"keys": [KEY]})
+    resp = client.get(f"/{OBJ_PATH}", follow_redirects=False)
+    assert resp.headers["location"] == SERVER_A + OBJ_PATH
+
+
+@respx.mock
+def test_locate_objects_unreachable(client):
+    respx.post(SERVER_A + BUCKET + "/_stat").mock(side_effect=httpx.ConnectError("down"))
+    respx.post(SERVER_B + BUCKET + "/_stat").mock(
+        return_value=httpx.Response(200, json=_stat(KEY)))
+    resp = client.post(f"/{BUCKET}/_locate", json={"keys": [KEY, "other"]})
+    assert resp.json()["locations"] == {KEY: [SERVER_B], "other": []}
+    assert resp.json()["unreachable"] == [SERVER_A]
+
+
+def test_locate_objects_batch_limit(client):
+    keys = [f"k{i}" for i in range(locator.BATCH_LIMIT + 1)]
+    assert client.post(f"/{BUCKET}/_locate", json={"keys": keys}).status_code == 422
+
+
+@respx.mock
+def test_place_objects(client):
+    for server in (SERVER_A, SERVER_B):
+        respx.get(server + "health").mock(return_value=httpx.Response(200, json=_health()))
+    respx.post(SERVER_A + BUCKET + "/_stat").mock(
+        return_value=httpx.Response(200, json=_stat("old")))
+    respx.post(SERVER_B + BUCKET + "/_stat").mock(return_value=httpx.Response(404))
+    objects = [{"key": "new-1", "size": 10}, {"key": "old", "size": 10},
+               {"key": "new-1", "size": 10}, {"key": "huge", "size": 10 ** 10}]
+    resp = client.post(f"/{BUCKET}/_place", json={"objects": objects})
+    assert resp.status_code == 200
+    data = resp.json()
+    # Only server A has the bucket.
+    assert data["placements"] == {"new-1": f"{SERVER_A}{BUCKET}/new-1"}
+    assert data["conflicts"] == ["old", "new-1"]
+    assert data["unplaced"] == ["huge"]
+    assert data["retry"] == []
+
+
+@respx.mock
+def test_place_objects_reserves_as_it_goes(client):
+    """A batch spills onto the next server once the first is promised full."""
+    for server in (SERVER_A, SERVER_B):
+        respx.get(server + "health").mock(
+            return_value=httpx.Response(200, json=_health(available=150 * 1024 * 1024)))
+        respx.post(server + BUCKET + "/_stat").mock(return_value=httpx.Response(200, json=_stat()))
+    size = 100 * 1024 * 1024
+    objects = [{"key": f"k{i}", "size": size} for i in range(3)]
+    data = client.post(f"/{BUCKET}/_place", json={"objects": objects}).json()
+    servers = {url.removesuffix(f"{BUCKET}/{key}") for key, url in data["placements"].items()}
+    assert servers == {SERVER_A, SERVER_B}
+    assert data["unplaced"] == ["k2"]
+
+
+@respx.mock
+def test_place_objects_respects_upload_cap(client, monkeypatch):
+    """A batch can't reserve more in-flight uploads per server than a PUT could."""
+    monkeypatch.setattr(locator, "UPLOADS_PER_SERVER", 2)
+    for server in (SERVER_A, SERVER_B):
+        respx.get(server + "health").mock(return_value=httpx.Response(200, json=_health()))
+        respx.post(server + BUCKET + "/_stat").mock(return_value=httpx.Response(200, json=_stat()))
+    objects = [{"key": f"k{i}", "size": 10} for i in range(6)]
+    data = client.post(f"/{BUCKET}/_place", json={"objects": objects}).json()
+    servers = [url.removesuffix(f"{BUCKET}/{key}") for key, url in data["placements"].items()]
+    assert sorted(servers) == [SERVER_A, SERVER_A, SERVER_B, SERVER_B]
+    assert data["retry"] == ["k4", "k5"]
+    assert data["unplaced"] == []
@@ -1,11 +1,16 @@
 """Phase 1 tests — Repr-Digest, Content-Digest, and Content-Type headers."""
 
+import asyncio
 import base64
 import errno as errno_mod
 import fcntl
 import hashlib
+import inspect
+import json
 import os
+import httpx
 import pytest
+import respx
 
 from fastapi.testclient import TestClient
 
@@ -44,6 +49,61 @@ def test_put(client):
     assert resp.headers["Repr-Digest"] == expected
 
 
+def test_put_does_not_reread_object(client, monkeypatch):
+    """The digest is computed while streaming; the object is not read back."""
+    def no_reread(path):
+        raise AssertionError("object re-read from disk")
+    monkeypatch.setattr(server, "file_checksum", no_reread)
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", content=TEST_CONTENT)
+    assert resp.status_code == 201
+    assert resp.headers["Repr-Digest"] == _expected_digest(TEST_CONTENT)
+
+
+def test_put_verify_from_disk(client, tmp_path, monkeypatch):
+    """VERIFY_FROM_DISK re-reads the object; a disagreement fails the PUT."""
+    monkeypatch.setattr(server, "VERIFY_FROM_DISK", True)
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", content=TEST_CONTENT)
+    assert resp.status_code == 201
+    monkeypatch.setattr(server, "file_checksum", lambda path: b"\0" * 32)
+    resp = client.put(f"/{BUCKET}/other.bin", content=TEST_CONTENT)
+    assert resp.status_code == 500
+    assert not (tmp_path / BUCKET / "other.bin").exists()
+
+
+def test_put_group_commit(client, tmp_path, monkeypatch):
+    """With GROUP_COMMIT set the checksum line is still written before 201."""
+    monkeypatch.setattr(server, "GROUP_COMMIT", 0.001)
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", content=TEST_CONTENT)
+    assert resp.status_code == 201
+    line = (tmp_path / f"{BUCKET}.sha256").read_text()
+    assert line == f"{hashlib.sha256(TEST_CONTENT).hexdigest()}  {TEST_FILE}\n"
+
+
+def test_put_group_commit_batches_appends(client, tmp_path, monkeypatch):
+    """Concurrent PUTs to one bucket share checksum-file writes."""
+    monkeypatch.setattr(server, "GROUP_COMMIT", 0.05)
+    batches = []
+    real_append_many = server.ChecksumFile.append_many
+
+    def counting_append_many(self, entries):
+        batches.append(len(entries))
+        real_append_many(self, entries)
+    monkeypatch.setattr(server.ChecksumFile, "append_many", counting_append_many)
+
+    async def put_all():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as aclient:
+            return await asyncio.gather(*[
+                aclient.put(f"/{BUCKET}/obj-{i}.bin", content=TEST_CONTENT)
+                for i in range(8)])
+
+    responses = asyncio.run(put_all())
+    assert [r.status_code for r in responses] == [201] * 8
+    assert sum(batches) == 8
+    assert len(batches) < 8
+    assert len((tmp_path / f"{BUCKET}.sha256").read_text().splitlines()) == 8
+
+
 def test_put_length_mismatch(client, tmp_path):
     """A Content-Length disagreeing with the body returns 400 and leaves no file."""
     resp = client.put(
@@ -64,6 +124,78 @@ def test_get(uploaded):
     assert resp.headers["Repr-Digest"] == expected
 
 
+def test_get_range(uploaded):
+    resp = uploaded.get(f"/{BUCKET}/{TEST_FILE}", headers={"Range": "bytes=7-11"})
+    assert resp.status_code == 206
+    assert resp.content == TEST_CONTENT[7:12]
+    assert resp.headers["Content-Range"] == f"bytes 7-11/{len(TEST_CONTENT)}"
+    assert resp.headers["Repr-Digest"] == _expected_digest(TEST_CONTENT)
+
+
+def _run_response(response, extensions):
+    """Drive an ASGI response directly; return the messages it sends."""
+    scope = {"type": "http", "method": "GET", "headers": [],
+             "asgi": {"spec_version": "2.4"}, "extensions": extensions}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response(scope, receive, send))
+    return messages
+
+
+def test_get_zerocopysend(tmp_path):
+    """A server offering zerocopysend gets the file handed over, not its bytes."""
+    path = tmp_path / TEST_FILE
+    path.write_bytes(TEST_CONTENT)
+    messages = _run_response(server.ObjectFileResponse(path),
+                             {"http.response.zerocopysend": {}})
+    assert messages[0]["status"] == 200
+    assert messages[1]["type"] == "http.response.zerocopysend"
+    assert (messages[1]["offset"], messages[1]["count"]) == (0, len(TEST_CONTENT))
+
+
+def test_get_cache_hints(tmp_path, monkeypatch):
+    """Large GETs are read sequentially and dropped from the page cache."""
+    path = tmp_path / TEST_FILE
+    path.write_bytes(TEST_CONTENT)
+    advice = []
+    monkeypatch.setattr(os, "posix_fadvise", lambda fd, off, length, hint: advice.append(hint))
+    monkeypatch.setattr(server, "DROP_CACHE_BYTES", 0)
+    messages = _run_response(server.ObjectFileResponse(path), {})
+    assert b"".join(m.get("body", b"") for m in messages) == TEST_CONTENT
+    assert advice == [os.POSIX_FADV_SEQUENTIAL, os.POSIX_FADV_DONTNEED]
+
+
+@pytest.mark.parametrize("name", ["_handle_simple", "_handle_single_range"])
+def test_object_file_response_overrides_match_starlette(name):
+    """ObjectFileResponse overrides private FileResponse methods: fail loudly if they change."""
+    from starlette.responses import FileResponse
+    ours = inspect.signature(getattr(server.ObjectFileResponse, name)).parameters
+    theirs = inspect.signature(getattr(FileResponse, name)).parameters
+    assert list(ours) == list(theirs)
+
+
+@pytest.mark.parametrize("range_header", [None, "bytes=7-11"])
+def test_get_goes_through_send_range(uploaded, monkeypatch, range_header):
+    """Starlette still routes whole-object and single-range GETs to our overrides."""
+    sent = []
+    real_send_range = server.ObjectFileResponse._send_range
+
+    async def recording_send_range(self, send, start, end):
+        sent.append((start, end))
+        await real_send_range(self, send, start, end)
+    monkeypatch.setattr(server.ObjectFileResponse, "_send_range", recording_send_range)
+    headers = {"Range": range_header} if range_header else {}
+    resp = uploaded.get(f"/{BUCKET}/{TEST_FILE}", headers=headers)
+    assert resp.status_code in (200, 206)
+    assert sent == ([(7, 12)] if range_header else [(0, len(TEST_CONTENT))])
+
+
 def test_head(uploaded):
     resp = uploaded.head(f"/{BUCKET}/{TEST_FILE}")
     assert resp.status_code == 200
@@ -175,6 +307,150 @@ def test_put_no_space_returns_507(client, tmp_path, monkeypatch):
     assert not (tmp_path / BUCKET / TEST_FILE).exists()
 
 
+def test_put_write_behind_backpressure(client, monkeypatch):
+    """A queue depth of one still stores every chunk in order."""
+    monkeypatch.setattr(server, "WRITE_BEHIND_CHUNKS", 1)
+    chunks = [bytes([i]) * 4096 for i in range(8)]
+    body = b"".join(chunks)
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", content=iter(chunks),
+                      headers={"Content-Length": str(len(body))})
+    assert resp.status_code == 201
+    assert resp.headers["Repr-Digest"] == _expected_digest(body)
+    assert client.get(f"/{BUCKET}/{TEST_FILE}").content == body
+
+
+def test_put_writer_thread_no_space_returns_507(client, tmp_path, monkeypatch):
+    """ENOSPC raised on the disk writer thread surfaces as 507."""
+    def write_enospc(fd, chunk, hash_sha256):
+        raise OSError(errno_mod.ENOSPC, "No space left on device")
+    monkeypatch.setattr(server, "_write_chunk", write_enospc)
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", content=TEST_CONTENT)
+    assert resp.status_code == 507
+    assert not (tmp_path / BUCKET / TEST_FILE).exists()
+
+
+def test_put_preallocate_no_space_returns_507(client, tmp_path, monkeypatch):
+    """ENOSPC from preallocation fails the PUT before any body is written."""
+    def fallocate_enospc(fd, offset, length):
+        raise OSError(errno_mod.ENOSPC, "No space left on device")
+    def no_write(fd, chunk, hash_sha256):
+        raise AssertionError("body written despite failed preallocation")
+    monkeypatch.setattr(os, "posix_fallocate", fallocate_enospc)
+    monkeypatch.setattr(server, "_write_chunk", no_write)
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", content=TEST_CONTENT)
+    assert resp.status_code == 507
+    assert not (tmp_path / BUCKET / TEST_FILE).exists()
+
+
+def test_put_preallocate_unsupported_ignored(client, monkeypatch):
+    """A filesystem that cannot preallocate still accepts the PUT."""
+    def fallocate_unsupported(fd, offset, length):
+        raise OSError(errno_mod.EOPNOTSUPP, "Operation not supported")
+    monkeypatch.setattr(os, "posix_fallocate", fallocate_unsupported)
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", content=TEST_CONTENT)
+    assert resp.status_code == 201
+
+
+PEER = "http://peer-server/"
+PEER_OBJECT = PEER + BUCKET + "/" + TEST_FILE
+
+
+@pytest.fixture()
+def peers(monkeypatch):
+    """Allow pulling from PEER, written without a trailing slash."""
+    monkeypatch.setattr(server, "COPY_PEERS", (PEER.rstrip("/"),))
+
+
+def _mock_peer(content=TEST_CONTENT, digest=None, status=200, headers=None):
+    headers = {"Repr-Digest": digest or _expected_digest(content), **(headers or {})}
+    return respx.get(PEER_OBJECT).mock(
+        return_value=httpx.Response(status, content=content, headers=headers))
+
+
+@respx.mock
+def test_put_copy_source_pulls_from_peer(client, tmp_path, peers):
+    _mock_peer()
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", headers={"Copy-Source": PEER_OBJECT})
+    assert resp.status_code == 201
+    assert resp.headers["Repr-Digest"] == _expected_digest(TEST_CONTENT)
+    assert (tmp_path / BUCKET / TEST_FILE).read_bytes() == TEST_CONTENT
+    line = (tmp_path / f"{BUCKET}.sha256").read_text()
+    assert line == f"{hashlib.sha256(TEST_CONTENT).hexdigest()}  {TEST_FILE}\n"
+
+
+@respx.mock
+def test_put_copy_source_digest_disagrees_with_peer(client, tmp_path, peers):
+    route = _mock_peer()
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", headers={
+        "Copy-Source": PEER_OBJECT, "Repr-Digest": _expected_digest(b"other")})
+    assert resp.status_code == 409
+    assert route.called
+    assert not (tmp_path / BUCKET / TEST_FILE).exists()
+
+
+@respx.mock
+def test_put_copy_source_corrupt_body_rejected(client, tmp_path, peers):
+    _mock_peer(content=b"bit rot", digest=_expected_digest(TEST_CONTENT))
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", headers={"Copy-Source": PEER_OBJECT})
+    assert resp.status_code == 400
+    assert not (tmp_path / BUCKET / TEST_FILE).exists()
+
+
+@respx.mock
+def test_put_copy_source_busy_peer(client, tmp_path, peers):
+    _mock_peer(content=b"", status=503, headers={"Retry-After": "7"})
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", headers={"Copy-Source": PEER_OBJECT})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "7"
+    assert not (tmp_path / BUCKET / TEST_FILE).exists()
+
+
+@respx.mock
+def test_put_copy_source_unreachable_peer(client, tmp_path, peers):
+    respx.get(PEER_OBJECT).mock(side_effect=httpx.ConnectError("down"))
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", headers={"Copy-Source": PEER_OBJECT})
+    assert resp.status_code == 502
+    assert not (tmp_path / BUCKET / TEST_FILE).exists()
+
+
+def test_put_copy_source_not_a_peer(client, monkeypatch):
+    monkeypatch.setattr(server, "COPY_PEERS", ("http://other-server/",))
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", headers={"Copy-Source": PEER_OBJECT})
+    assert resp.status_code == 403
+
+
+@respx.mock
+def test_put_copy_source_refused_without_peers(client, monkeypatch):
+    """Unset COPY_PEERS: the server must not fetch arbitrary URLs for clients."""
+    monkeypatch.setattr(server, "COPY_PEERS", ())
+    route = _mock_peer()
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", headers={"Copy-Source": PEER_OBJECT})
+    assert resp.status_code == 403
+    assert not route.called
+
+
+@pytest.mark.parametrize("source", [
+    "http://peer-server@evil/" + BUCKET + "/" + TEST_FILE,
+    "http://peer-server.evil/" + BUCKET + "/" + TEST_FILE,
+    "https://peer-server/" + BUCKET + "/" + TEST_FILE,
+    "http://peer-server:8080/" + BUCKET + "/" + TEST_FILE,
+])
+def test_put_copy_source_matches_peer_origin(client, peers, source):
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", headers={"Copy-Source": source})
+    assert resp.status_code == 403
+
+
+@respx.mock
+def test_put_copy_source_without_length_is_bad_gateway(client, tmp_path, peers):
+    async def chunked():
+        yield TEST_CONTENT
+    respx.get(PEER_OBJECT).mock(return_value=httpx.Response(
+        200, content=chunked(), headers={"Repr-Digest": _expected_digest(TEST_CONTENT)}))
+    resp = client.put(f"/{BUCKET}/{TEST_FILE}", headers={"Copy-Source": PEER_OBJECT})
+    assert resp.status_code == 502
+    assert not (tmp_path / BUCKET / TEST_FILE).exists()
+
+
 def test_path_traversal_returns_404(tmp_path, monkeypatch):
     """safe_path raises 404 for path traversal attempts."""
     from fastapi import HTTPException
@@ -213,3 +489,186 @@ def test_get_skips_malformed_checksum_line(uploaded, tmp_path):
     assert resp.status_code == 200
     assert resp.content == TEST_CONTENT
     assert resp.headers["Repr-Digest"] == _expected_digest(TEST_CONTENT)
+
+
+# --- GET /{bucket}/ listing ---
+
+@pytest.fixture()
+def listed(client, tmp_path):
+    """Client with five objects and one subdirectory in BUCKET."""
+    for name in ["e.bin", "a.bin", "c.txt", "b.bin", "d.bin"]:
+        assert client.put(f"/{BUCKET}/{name}", content=name.encode()).status_code == 201
+    (tmp_path / BUCKET / "sub").mkdir()
+    return client
+
+
+def test_list_bucket(listed):
+    resp = listed.get(f"/{BUCKET}/")
+    assert resp.status_code == 200
+    objects = resp.json()["objects"]
+    assert set(objects) == {"a.bin", "b.bin", "c.txt", "d.bin", "e.bin", "sub"}
+    assert objects["a.bin"] == {"directory": False, "size": 5,
+                                "checksum": hashlib.sha256(b"a.bin").hexdigest()}
+    assert objects["sub"] == {"directory": True, "size": None, "checksum": None}
+    assert "truncated" not in resp.json()
+
+
+def test_list_bucket_prefix(listed):
+    resp = listed.get(f"/{BUCKET}/", params={"prefix": "c"})
+    assert set(resp.json()["objects"]) == {"c.txt"}
+
+
+def test_list_bucket_pages_in_key_order(listed):
+    keys = []
+    start_after = None
+    while True:
+        params = {"limit": 2}
+        if start_after is not None:
+            params["start-after"] = start_after
+        page = listed.get(f"/{BUCKET}/", params=params).json()
+        page_keys = list(page["objects"])
+        assert page_keys == sorted(page_keys)
+        keys += page_keys
+        if not page["truncated"]:
+            break
+        start_after = page_keys[-1]
+    assert keys == ["a.bin", "b.bin", "c.txt", "d.bin", "e.bin", "sub"]
+
+
+def test_list_bucket_ndjson(listed):
+    resp = listed.get(f"/{BUCKET}/", params={"limit": 3, "start-after": "a.bin"},
+                      headers={"Accept": "application/x-ndjson"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["key"] for line in lines] == ["b.bin", "c.txt", "d.bin"]
+    assert lines[0]["checksum"] == hashlib.sha256(b"b.bin").hexdigest()
+
+
+def test_list_bucket_ndjson_key_order(listed):
+    resp = listed.get(f"/{BUCKET}/", params={"order": "key", "start-after": "b.bin"},
+                      headers={"Accept": "application/x-ndjson"})
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["key"] for line in lines] == ["c.txt", "d.bin", "e.bin", "sub"]
+    assert lines[0]["checksum"] == hashlib.sha256(b"c.txt").hexdigest()
+    assert lines[3] == {"key": "sub", "directory": True, "size": None, "checksum": None}
+
+
+def test_list_bucket_bad_order(listed):
+    assert listed.get(f"/{BUCKET}/", params={"order": "size"}).status_code == 422
+
+
+def test_list_bucket_bad_limit(listed):
+    assert listed.get(f"/{BUCKET}/", params={"limit": 0}).status_code == 422
+
+
+@pytest.fixture()
+def settled(listed, monkeypatch):
+    """listed, with ETags issued however recently the bucket changed."""
+    monkeypatch.setattr(server, "ETAG_SETTLE", 0)
+    return listed
+
+
+def test_list_bucket_not_modified(settled):
+    etag = settled.get(f"/{BUCKET}/").headers["ETag"]
+    resp = settled.get(f"/{BUCKET}/", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    assert settled.get(f"/{BUCKET}/", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+
+def test_list_bucket_etag_changes_on_put(settled):
+    etag = settled.get(f"/{BUCKET}/").headers["ETag"]
+    assert settled.put(f"/{BUCKET}/f.bin", content=b"new").status_code == 201
+    resp = settled.get(f"/{BUCKET}/", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+def test_list_bucket_etag_per_representation(settled):
+    etag = settled.get(f"/{BUCKET}/").headers["ETag"]
+    assert settled.get(f"/{BUCKET}/", params={"prefix": "a"}).headers["ETag"] != etag
+    ndjson = settled.get(f"/{BUCKET}/", headers={"Accept": "application/x-ndjson",
+                                                  "If-None-Match": etag})
+    assert ndjson.status_code == 200
+    assert ndjson.headers["ETag"] != etag
+
+
+def test_list_bucket_no_etag_while_settling(listed):
+    """A directory changed within ETAG_SETTLE seconds is not given an ETag."""
+    assert "ETag" not in listed.get(f"/{BUCKET}/").headers
+
+
+# --- change feed ---
+
+def test_changes_since(listed):
+    feed = listed.get(f"/{BUCKET}/", params={"changes-since": 0}).json()
+    assert feed["reset"] is False
+    assert [c["key"] for c in feed["changes"]] == ["e.bin", "a.bin", "c.txt", "b.bin", "d.bin"]
+    assert feed["changes"][1] == {"key": "a.bin", "size": 5,
+                                  "checksum": hashlib.sha256(b"a.bin").hexdigest()}
+    listed.put(f"/{BUCKET}/f.bin", content=b"new")
+    more = listed.get(f"/{BUCKET}/", params={"changes-since": feed["offset"],
+                                             "file-id": feed["file-id"]}).json()
+    assert [c["key"] for c in more["changes"]] == ["f.bin"]
+    again = listed.get(f"/{BUCKET}/", params={"changes-since": more["offset"],
+                                              "file-id": more["file-id"]}).json()
+    assert again["changes"] == []
+    assert again["offset"] == more["offset"]
+
+
+def test_changes_since_limit(listed):
+    first = listed.get(f"/{BUCKET}/", params={"changes-since": 0, "limit": 2}).json()
+    assert [c["key"] for c in first["changes"]] == ["e.bin", "a.bin"]
+    rest = listed.get(f"/{BUCKET}/", params={"changes-since": first["offset"]}).json()
+    assert [c["key"] for c in rest["changes"]] == ["c.txt", "b.bin", "d.bin"]
+
+
+def test_changes_since_rewritten_file_resets(listed, tmp_path):
+    feed = listed.get(f"/{BUCKET}/", params={"changes-since": 0}).json()
+    cksum = tmp_path / f"{BUCKET}.sha256"
+    new = tmp_path / "rewritten"
+    new.write_text(cksum.read_text().splitlines(keepends=True)[0])
+    os.replace(new, cksum)
+    resp = listed.get(f"/{BUCKET}/", params={"changes-since": feed["offset"],
+                                             "file-id": feed["file-id"]}).json()
+    assert resp["reset"] is True
+    assert [c["key"] for c in resp["changes"]] == ["e.bin"]
+
+
+def test_changes_since_no_checksum_file(client):
+    feed = client.get(f"/{BUCKET}/", params={"changes-since": 0}).json()
+    assert feed == {"bucket": BUCKET, "file-id": None, "offset": 0,
+                    "reset": False, "changes": []}
+
+
+# --- POST /{bucket}/_stat ---
+
+def test_stat_objects(listed, tmp_path):
+    (tmp_path / BUCKET / "uploading.bin").write_bytes(b"partial")
+    fd = os.open(tmp_path / BUCKET / "uploading.bin", os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        resp = listed.post(f"/{BUCKET}/_stat",
+                           json={"keys": ["a.bin", "uploading.bin", "nope", "sub", "..", "x/a.bin"]})
+    finally:
+        os.close(fd)
+    assert resp.status_code == 200
+    objects = resp.json()["objects"]
+    assert objects["a.bin"] == {"size": 5, "checksum": hashlib.sha256(b"a.bin").hexdigest(),
+                                "busy": False}
+    assert objects["uploading.bin"] == {"size": 7, "checksum": None, "busy": True}
+    assert objects["nope"] is None
+    assert objects["sub"] is None
+    assert objects[".."] is None
+    assert objects["x/a.bin"] is None
+
+
+def test_stat_objects_missing_bucket(client):
+    assert client.post("/no-such-bucket/_stat", json={"keys": ["a"]}).status_code == 404
+
+
+def test_stat_objects_batch_limit(client):
+    keys = [str(i) for i in range(server.STAT_LIMIT + 1)]
+    assert client.post(f"/{BUCKET}/_stat", json={"keys": keys}).status_code == 422